@@ -1,13 +1,25 @@
+from time import perf_counter
+
+# Recorded before the remaining imports so that '--profile-startup' can report how long they take.
+IMPORTS_STARTED = perf_counter()
+
 from argparse import ArgumentParser, Namespace
 import traceback
-from sys import stderr
+from sys import stderr, stdin, stdout
 from objects.threads.FolderThread import FolderThread
+from objects.threads.AutoUploadThread import AutoUploadThread
 from utils.logger.logger import log
+from objects.interface.dbconn import connection_manager
 from utils.startup import currency_startup, db_startup
-from utils.exceptions import BadSignIn
+from utils.exceptions import BadSignIn, InvalidReport
 from utils.builders.folderbuilder import create_user_folder
 from menus.user.Menu import Menu
 from menus.account.SignIn import SignIn, sign_in
+from utils.profiler.profiler import StartupProfiler
+from utils.reports.reports import load_report_specs, run_reports, write_reports_csv, write_reports_json
+import utils.globals as _globals
+
+IMPORTS_FINISHED = perf_counter()
 
 
 def setup_args() -> Namespace:
@@ -21,6 +33,27 @@ def setup_args() -> Namespace:
                         action='store_true')
     parser.add_argument('-u', '--username', help='the username to sign in with.')
     parser.add_argument('-p', '--password', help='the password to sign in with.')
+    parser.add_argument('-a', '--auto_upload', help='upload files as soon as they are placed within the \'Upload\' '
+                                                    'directory.', action='store_true')
+    parser.add_argument('-w', '--workers', type=int, default=_globals.INGEST_WORKERS,
+                        help='the number of processes used to parse uploaded files.')
+    parser.add_argument('--poll_interval', type=float, default=_globals.FOLDER_POLL_INTERVAL,
+                        help='the number of seconds between scans of the \'Upload\' directory when the folder '
+                             'cannot be watched natively.')
+    parser.add_argument('-r', '--render', choices=['png', 'svg'],
+                        help='save visualizations as images within the \'Charts\' directory instead of displaying '
+                             'them.')
+    parser.add_argument('--db_profile', choices=list(_globals.DATABASE_PROFILES), default=_globals.DATABASE_PROFILE,
+                        help='the sqlite tuning profile used by the database connections.')
+    parser.add_argument('--profile-startup', dest='profile_startup', action='store_true',
+                        help='report the time taken by each phase of startup.')
+
+    subparsers = parser.add_subparsers(dest='command')
+    batch = subparsers.add_parser('batch', help='run a batch of reports without the menu, then exit.')
+    batch.add_argument('specs', help='the json file listing the reports to run, or \'-\' to read from stdin. Reports '
+                                     'that do not name a \'user\' are run for the signed in user.')
+    batch.add_argument('-f', '--format', choices=['json', 'csv'], default='json', help='the format of the results.')
+    batch.add_argument('-o', '--output', help='the file to write the results to. Defaults to stdout.')
     return parser.parse_args()
 
 
@@ -34,6 +67,28 @@ def user_excluded_sign_in_params(args: Namespace) -> bool:
                 not args.username and args.password)
 
 
+def run_batch(args: Namespace, user) -> None:
+    """
+    Run a batch of reports within this process, then write their results.
+    :param args: The command line arguments.
+    :param user: The signed in user, or None if no user signed in.
+    """
+    if args.specs == '-':
+        specs = load_report_specs(stdin)
+    else:
+        with open(args.specs) as file:
+            specs = load_report_specs(file)
+
+    results = run_reports(specs, default_user=user)
+    write_results = write_reports_csv if args.format == 'csv' else write_reports_json
+
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            write_results(results, file)
+    else:
+        write_results(results, stdout)
+
+
 def main() -> None:
     """
     Run the application.
@@ -43,34 +98,68 @@ def main() -> None:
     show_console_information = False
     show_visual_information = False
     bad_parameter_sign_in = False
+    profiler = StartupProfiler(enabled=args.profile_startup, started=IMPORTS_STARTED)
+    profiler.record("imports", IMPORTS_FINISHED - IMPORTS_STARTED)
+
+    # Set the number of processes used to parse uploaded files.
+    _globals.INGEST_WORKERS = max(1, args.workers)
+
+    # Set the tuning profile of the database connections.
+    connection_manager.set_profile(args.db_profile)
+
+    # Set the format visualizations are saved as, if they are not to be displayed.
+    _globals.RENDER_FORMAT = args.render
 
     # Initialize the database, create the tables if they don't exist.
-    db_startup.startup()
+    with profiler.phase("db_startup"):
+        db_startup.startup()
 
     # Populate all of the available currencies into the database.
-    currency_startup.startup()
+    with profiler.phase("currency_startup"):
+        currency_startup.startup()
 
     # Perform an initial sign in if a username and password were detected.
     try:
         if args.username and args.password:
-            user = sign_in(args.username, args.password)
+            with profiler.phase("sign-in"):
+                user = sign_in(args.username, args.password)
     except BadSignIn as bsi:
         stderr.write(f"{bsi.message}\n")
         log(traceback.format_exc(), level="warning")
         log(bsi.message, level="warning")
         bad_parameter_sign_in = True  # update the boolean to have the user perform a 'regular' sign on.
 
+    profiler.report()
+
+    # Run the batch of reports without the menu or the folder thread, then exit.
+    if args.command == 'batch':
+        if bad_parameter_sign_in:
+            exit(-1)
+        try:
+            run_batch(args, user)
+        except (InvalidReport, OSError, ValueError) as e:
+            stderr.write(f"{getattr(e, 'message', e)}\n")
+            log(traceback.format_exc(), level="warning")
+            exit(-1)
+        return
+
     # Determine which information should be displayed.
     if args.show_console:
         show_console_information = True
-    if args.show_visual:
+    if args.show_visual or args.render:
         show_visual_information = True
 
     try:
         # Initialize the (daemon) folder thread, which will monitor the 'Upload' directory.
-        folder_thread = FolderThread()
+        folder_thread = FolderThread(interval=args.poll_interval)
         folder_thread.start()
 
+        # Initialize the (daemon) auto upload thread, which uploads the files reported by the folder thread one at a
+        # time, without blocking the folder thread or the menus.
+        auto_upload_thread = AutoUploadThread()
+        if args.auto_upload:
+            auto_upload_thread.start()
+
         program_running = True
         user_has_signed_out = False
 
@@ -84,8 +173,13 @@ def main() -> None:
                 # Create the current user's directory (if it doesn't already exist) within the 'Users' directory.
                 create_user_folder(user=user)
 
+                # Upload the signed in user's files as soon as they are placed within the 'Upload' directory.
+                if args.auto_upload:
+                    folder_thread.on_upload = lambda files, current_user=user: auto_upload_thread.request(current_user)
+
                 # Run the application.
                 user_has_signed_out = Menu(user=user, show_console=show_console_information, show_visual=show_visual_information).run()
+                folder_thread.on_upload = None
 
     except Exception as e:
         log(str(e), level="critical")
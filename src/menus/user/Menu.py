@@ -1,5 +1,5 @@
 from objects.user.User import User
-from objects.interface.dbconn import DB
+from utils.cache.cache import get_transaction_stats
 from objects.user.Currency import get_currency_symbol
 from objects.threads.UploadThread import UploadThread
 import utils.globals as _globals
@@ -22,37 +22,26 @@ def user_has_data(user: User) -> bool:
     :return: True if the user has data. False otherwise.
     """
     # Determine if the user has any available data.
-    try:
-        user.get_earliest_transaction_date()
-    except Exception:  # excepting NoDataFound here does not work for some reason?
+    if len(get_transaction_stats(user.id)) == 0:
         print_error("No data is currently available.")
         return False
     return True
 
 
-def is_valid_year(year_to_check: str) -> bool:
+def is_valid_year(year_to_check: str, user: User) -> bool:
     """
-    Determine if the passed in year currently exists within the database.
+    Determine if the user has any transactions within the passed in year.
     :param year_to_check: The year to check.
+    :param user: The user to check.
     :return: True if the year exists, false otherwise.
     """
-    year_is_valid = False
-    db = DB(_globals.DATABASE)
-    years = db.fetchall(f"SELECT DISTINCT strftime('%Y', Date) from Transactions;")
-    db.close()
-
-    # search through all the years. If the year that was specified exists, set the flag to true.
-    for year in years:
-        if year_to_check == year[0]:
-            year_is_valid = True
-            break
-
-    return year_is_valid
+    return get_transaction_stats(user.id).has_year(year_to_check)
 
 
-def get_month_and_year() -> (Months, str):
+def get_month_and_year(user: User) -> (Months, str):
     """
     Prompt a user to enter a month and a year.
+    :param user: The user whose transactions the year must be within.
     :raises InvalidMonth: Exception that is to be raised when user enters an invalid month.
     :raises InvalidYear: Exception that is to be raised when user enters an invalid year.
     :return: A Month enum and the year the user selected.
@@ -61,7 +50,7 @@ def get_month_and_year() -> (Months, str):
     month_enum = month_string_to_enum(month)
     if is_valid_month(month_enum):
         year = input("Enter a year:\t")
-        if is_valid_year(year):
+        if is_valid_year(year, user):
             return month_enum, year
         else:
             raise InvalidYear(year)
@@ -69,14 +58,15 @@ def get_month_and_year() -> (Months, str):
         raise InvalidMonth(month)
 
 
-def get_year():
+def get_year(user: User):
     """
     Prompt a user to enter a year.
+    :param user: The user whose transactions the year must be within.
     :raises InvalidYear: Exception that is to be raised if a user enters an invalid year.
     :return: The year the user enters.
     """
     year = input("Enter a year:\t")
-    if is_valid_year(year):
+    if is_valid_year(year, user):
         return year
     raise InvalidYear(year)
 
@@ -266,7 +256,7 @@ class Menu:
             return
 
         try:
-            month, year = get_month_and_year()
+            month, year = get_month_and_year(self.user)
         except (InvalidMonth, InvalidYear) as e:
             print_error(e.message)
             return
@@ -286,7 +276,7 @@ class Menu:
             return
 
         try:
-            year = get_year()
+            year = get_year(self.user)
         except InvalidYear as iy:
             print_error(iy.message)
             return
@@ -312,7 +302,7 @@ class Menu:
             return
 
         try:
-            month, year = get_month_and_year()
+            month, year = get_month_and_year(self.user)
         except (InvalidMonth, InvalidYear) as e:
             print_error(e.message)
             return
@@ -344,7 +334,7 @@ class Menu:
             return
 
         try:
-            year = get_year()
+            year = get_year(self.user)
         except InvalidYear as iy:
             print_error(iy.message)
             return
@@ -455,9 +445,9 @@ class Menu:
 
         try:
             print_message("Select your first month/year:")
-            month1, year1 = get_month_and_year()
+            month1, year1 = get_month_and_year(self.user)
             print_message("Select your second month/year:")
-            month2, year2 = get_month_and_year()
+            month2, year2 = get_month_and_year(self.user)
         except (InvalidMonth, InvalidYear) as e:
             print_error(e.message)
             return
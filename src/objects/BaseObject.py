@@ -3,6 +3,9 @@ class BaseObject:
     Abstract class that will be used to construct several different type of objects.
     """
 
+    # Declared so that subclasses defining their own __slots__ are not given a __dict__.
+    __slots__ = ()
+
     def __init__(self) -> None:
         pass
 
@@ -1,16 +1,76 @@
 from objects.BaseObject import BaseObject
 from objects.interface.dbconn import DB
-from objects.accounts.Transaction import Transaction
-from utils.formatting.formatter import format_date
+from objects.accounts.Transaction import Transaction, build_transaction_row
+from utils.formatting.formatter import format_date, format_amount_to_cents
+from utils.hashing.hashing import fingerprint
+from utils.classifier.classifier import get_payment_rules
 from utils.enums import Tables
 
 
+# The columns of an Apple Card export.
+APPLE_COLUMNS = ("Transaction Date", "Clearing Date", "Description", "Merchant", "Category", "Type", "Amount (USD)")
+
+
+def build_apple_row(values: list, user_id: int, is_payment: bool = None) -> tuple:
+    """
+    Build the rows inserted into the database straight from a row of an Apple Card export.
+    :param values: The csv row of the receipt.
+    :param user_id: The id of the current user.
+    :param is_payment: Whether the receipt is a payment, if already classified. Otherwise, the account's payment
+                       rules are applied to the row.
+    :return: A tuple containing the receipt row, in the same order as AppleReceipt.to_tuple(), and the transaction
+             row, or None if the receipt is a payment.
+    """
+    if is_payment is None:
+        is_payment = get_payment_rules('Apple', APPLE_COLUMNS).is_payment(values)
+
+    transaction_date = format_date(values[0])
+    clearing_date = format_date(values[1])
+    description = values[2]
+    merchant = values[3]
+    category = values[4]
+    receipt_type = values[5]
+    amount = values[6]
+
+    receipt_row = (transaction_date, clearing_date, description, merchant, category, receipt_type, amount, 'Apple',
+                   is_payment, not is_payment, user_id,
+                   fingerprint((transaction_date, clearing_date, description, merchant, category, receipt_type,
+                                amount)),
+                   format_amount_to_cents(amount))
+    if is_payment:
+        return receipt_row, None
+    return receipt_row, build_transaction_row(transaction_date, amount, 'Apple', merchant, description, user_id)
+
+
+def build_apple_rows(rows: list, user_id: int) -> tuple:
+    """
+    Build the rows inserted into the database for a batch of rows of an Apple Card export, classifying the whole
+    batch at once.
+    :param rows: The csv rows of the receipts.
+    :param user_id: The id of the current user.
+    :return: A tuple containing the receipt rows, and the transaction rows of the receipts that are not payments.
+    """
+    receipt_rows = []
+    transaction_rows = []
+    payments = get_payment_rules('Apple', APPLE_COLUMNS).classify(rows)
+    for row, is_payment in zip(rows, payments):
+        receipt_row, transaction_row = build_apple_row(row, user_id, is_payment)
+        receipt_rows.append(receipt_row)
+        if transaction_row is not None:
+            transaction_rows.append(transaction_row)
+    return receipt_rows, transaction_rows
+
+
 class AppleReceipt(BaseObject):
     """
     This class will be used to create a Apple receipt that will be used to insert the information about this
     transaction into the database.
     """
 
+    __slots__ = ('db', 'transaction_date', 'clearing_date', 'description', 'merchant', 'category', 'type', 'amount',
+                 'card_type', 'is_payment', 'is_transaction', 'user_id', 'fingerprint', 'amount_cents',
+                 'transaction')
+
     def __repr__(self) -> str:
         return super(AppleReceipt, self).__repr__()
 
@@ -27,18 +87,11 @@ class AppleReceipt(BaseObject):
         super(AppleReceipt, self).__init__()
 
         self.db = db
-        self.transaction_date = format_date(values[0])
-        self.clearing_date = format_date(values[1])
-        self.description = values[2]
-        self.merchant = values[3]
-        self.category = values[4]
-        self.type = values[5]
-        self.amount = values[6]
-        self.card_type = 'Apple'
-        self.is_payment = self.category == "Payment" or self.type == "Payment"
-        self.is_transaction = not self.is_payment
-        self.user_id = user_id
-        self.transaction = None if self.is_payment else Transaction(db, self, user_id)
+        receipt_row, transaction_row = build_apple_row(values, user_id)
+        (self.transaction_date, self.clearing_date, self.description, self.merchant, self.category, self.type,
+         self.amount, self.card_type, self.is_payment, self.is_transaction, self.user_id, self.fingerprint,
+         self.amount_cents) = receipt_row
+        self.transaction = None if transaction_row is None else Transaction(db, transaction_row)
 
     def to_list(self) -> list:
         """
@@ -48,7 +101,7 @@ class AppleReceipt(BaseObject):
         """
         return [self.transaction_date, self.clearing_date, self.description,
                 self.merchant, self.category, self.type, self.amount, self.card_type,
-                self.is_payment, self.is_transaction, self.user_id]
+                self.is_payment, self.is_transaction, self.user_id, self.fingerprint, self.amount_cents]
 
     def to_tuple(self) -> tuple:
         """
@@ -58,7 +111,7 @@ class AppleReceipt(BaseObject):
         """
         return (self.transaction_date, self.clearing_date, self.description,
                 self.merchant, self.category, self.type, self.amount, self.card_type,
-                self.is_payment, self.is_transaction, self.user_id)
+                self.is_payment, self.is_transaction, self.user_id, self.fingerprint, self.amount_cents)
 
     def to_dictionary(self) -> dict:
         """
@@ -77,7 +130,9 @@ class AppleReceipt(BaseObject):
             'card_type': self.card_type,
             'is_payment': self.is_payment,
             'is_transaction': self.is_transaction,
-            'user_id': self.user_id
+            'user_id': self.user_id,
+            'fingerprint': self.fingerprint,
+            'amount_cents': self.amount_cents
         }
 
     def format_amount(self) -> str:
@@ -90,31 +145,27 @@ class AppleReceipt(BaseObject):
     def insert_to_db(self) -> None:
         """
         Insert this receipt into the database as well as inserting it into the transactions table, if a transaction.
+        Receipts (and transactions) that already exist are left untouched.
         """
         query = '''INSERT INTO AppleReceipts(Transaction_Date, Clearing_Date, Description, Merchant,
-                                             Category, Type, Amount, Card_Type, Is_Payment, Is_Transaction, User_id)
-                   VALUES(?,?,?,?,?,?,?,?,?,?,?);'''
+                                             Category, Type, Amount, Card_Type, Is_Payment, Is_Transaction, User_id,
+                                             Fingerprint, Amount_Cents)
+                   VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)
+                   ON CONFLICT DO NOTHING;'''
         self.db.commit(query, values=self.to_tuple())
 
-        if self.is_transaction \
-                and self.transaction is not None \
-                and not self.transaction.exists_in_db():
+        if self.is_transaction and self.transaction is not None:
             self.transaction.insert_to_db()
 
     def exists_in_db(self) -> bool:
         """
-        May not work with duplicate transactions on same dates, may want to figure out better query.
         Check to see if this object exists within the db.
         :return: true if in db, false otherwise.
         """
-        query = '''SELECT * 
+        query = '''SELECT id 
                    FROM AppleReceipts 
-                   WHERE Transaction_Date=? AND Clearing_Date=? AND Description=? 
-                                            AND Merchant=? AND Category=? 
-                                            AND Type=? AND Amount=? 
-                                            AND Card_Type=? AND Is_Payment=?
-                                            AND Is_Transaction=? AND User_id=?;'''
-        return len(self.db.fetchall(query, values=self.to_tuple())) > 0
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return len(self.db.fetchall(query, values=(self.user_id, self.fingerprint))) > 0
 
     def get_id(self) -> int:
         """
@@ -123,12 +174,8 @@ class AppleReceipt(BaseObject):
         """
         query = '''SELECT id 
                    FROM AppleReceipts 
-                   WHERE Transaction_Date=? AND Clearing_Date=? AND Description=? 
-                                            AND Merchant=? AND Category=? 
-                                            AND Type=? AND Amount=? 
-                                            AND Card_Type=? AND Is_Payment=?
-                                            AND Is_Transaction=? AND User_id=?;'''
-        return int(self.db.fetchall(query, values=self.to_tuple())[0][0])
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return int(self.db.fetchall(query, values=(self.user_id, self.fingerprint))[0][0])
 
     def get_type(self) -> str:
         """
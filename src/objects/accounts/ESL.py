@@ -1,16 +1,83 @@
-from objects.accounts import Transaction
+from objects.accounts.Transaction import Transaction, build_transaction_row
 from objects.BaseObject import BaseObject
 from objects.interface.dbconn import DB
-from utils.formatting.formatter import format_date
+from utils.formatting.formatter import format_date, format_amount_to_cents
+from utils.hashing.hashing import fingerprint
+from utils.classifier.classifier import get_payment_rules
 from utils.enums import Tables
 
 
+# The columns of an ESL export.
+ESL_COLUMNS = ("Transaction Number", "Date", "Description", "Memo", "Amount Debit", "Amount Credit", "Balance",
+               "Check Number", "Fees")
+
+
+def build_esl_row(values: list, user_id: int, is_payment: bool = None) -> tuple:
+    """
+    Build the rows inserted into the database straight from a row of an ESL export.
+    :param values: The csv row of the receipt.
+    :param user_id: The id of the current user.
+    :param is_payment: Whether the receipt is a payment, if already classified. Otherwise, the account's payment
+                       rules are applied to the row.
+    :return: A tuple containing the receipt row, in the same order as ESLReceipt.to_tuple(), and the transaction
+             row, or None if the receipt is a payment.
+    """
+    if is_payment is None:
+        is_payment = get_payment_rules('ESL', ESL_COLUMNS).is_payment(values)
+
+    transaction_number = values[0]
+    date = format_date(values[1])
+    description = values[2]
+    memo = values[3]
+    amount_debit = values[4]
+    amount_credit = values[5]
+    balance = values[6]
+    check_number = values[7]
+    fees = values[8]
+
+    receipt_row = (transaction_number, date, description, memo, amount_debit, amount_credit, balance, check_number,
+                   fees, 'ESL', is_payment, not is_payment, user_id,
+                   fingerprint((transaction_number, date, description, memo, amount_debit, amount_credit, balance,
+                                check_number, fees)),
+                   format_amount_to_cents(amount_debit), format_amount_to_cents(amount_credit),
+                   format_amount_to_cents(balance))
+    if is_payment:
+        return receipt_row, None
+
+    # Transactions store the positive amount of either the debit or the credit.
+    amount = amount_debit.replace('-', '') if amount_debit != '' else amount_credit.replace('-', '')
+    return receipt_row, build_transaction_row(date, amount, 'ESL', memo, description, user_id)
+
+
+def build_esl_rows(rows: list, user_id: int) -> tuple:
+    """
+    Build the rows inserted into the database for a batch of rows of an ESL export, classifying the whole batch at
+    once.
+    :param rows: The csv rows of the receipts.
+    :param user_id: The id of the current user.
+    :return: A tuple containing the receipt rows, and the transaction rows of the receipts that are not payments.
+    """
+    receipt_rows = []
+    transaction_rows = []
+    payments = get_payment_rules('ESL', ESL_COLUMNS).classify(rows)
+    for row, is_payment in zip(rows, payments):
+        receipt_row, transaction_row = build_esl_row(row, user_id, is_payment)
+        receipt_rows.append(receipt_row)
+        if transaction_row is not None:
+            transaction_rows.append(transaction_row)
+    return receipt_rows, transaction_rows
+
+
 class ESLReceipt(BaseObject):
     """
     This class will be used to create a Apple receipt that will be used to insert the information about this
     transaction into the database.
     """
 
+    __slots__ = ('db', 'transaction_number', 'date', 'description', 'memo', 'amount_debit', 'amount_credit',
+                 'balance', 'check_number', 'fees', 'card_type', 'is_payment', 'is_transaction', 'user_id',
+                 'fingerprint', 'amount_debit_cents', 'amount_credit_cents', 'balance_cents', 'transaction')
+
     def __repr__(self) -> str:
         return super(ESLReceipt, self).__repr__()
 
@@ -27,25 +94,12 @@ class ESLReceipt(BaseObject):
         super(ESLReceipt, self).__init__()
 
         self.db = db
-        self.transaction_number = values[0]
-        self.date = format_date(values[1])
-        self.description = values[2]
-        self.memo = values[3]
-        self.amount_debit = values[4]
-        self.amount_credit = values[5]
-        self.balance = values[6]
-        self.check_number = values[7]
-        self.fees = values[8]
-        self.card_type = 'ESL'
-        self.is_payment = self.memo == "- PAYMENT" \
-                          or self.description == "Withdrawal Internet Transfer to" \
-                          or "ACH Deposit" in self.description \
-                          or self.description == "Overdraft Deposit" \
-                          or self.description == "Descriptive Deposit Mobile /" \
-                          or self.description == "Deposit Internet Transfer from"
-        self.is_transaction = not self.is_payment
-        self.user_id = user_id
-        self.transaction = None if self.is_payment else Transaction.Transaction(db, self, user_id)
+        receipt_row, transaction_row = build_esl_row(values, user_id)
+        (self.transaction_number, self.date, self.description, self.memo, self.amount_debit, self.amount_credit,
+         self.balance, self.check_number, self.fees, self.card_type, self.is_payment, self.is_transaction,
+         self.user_id, self.fingerprint, self.amount_debit_cents, self.amount_credit_cents,
+         self.balance_cents) = receipt_row
+        self.transaction = None if transaction_row is None else Transaction(db, transaction_row)
 
     def to_list(self) -> list:
         """
@@ -55,7 +109,8 @@ class ESLReceipt(BaseObject):
         """
         return [self.transaction_number, self.date, self.description, self.memo, self.amount_debit,
                 self.amount_credit, self.balance, self.check_number, self.fees, self.card_type,
-                self.is_payment, self.is_transaction, self.user_id]
+                self.is_payment, self.is_transaction, self.user_id, self.fingerprint,
+                self.amount_debit_cents, self.amount_credit_cents, self.balance_cents]
 
     def to_tuple(self) -> tuple:
         """
@@ -65,7 +120,8 @@ class ESLReceipt(BaseObject):
         """
         return (self.transaction_number, self.date, self.description, self.memo, self.amount_debit,
                 self.amount_credit, self.balance, self.check_number, self.fees, self.card_type,
-                self.is_payment, self.is_transaction, self.user_id)
+                self.is_payment, self.is_transaction, self.user_id, self.fingerprint,
+                self.amount_debit_cents, self.amount_credit_cents, self.balance_cents)
 
     def to_dictionary(self) -> dict:
         """
@@ -86,7 +142,11 @@ class ESLReceipt(BaseObject):
             'card_type': self.card_type,
             'is_payment': self.is_payment,
             'is_transaction': self.is_transaction,
-            'user_id': self.user_id
+            'user_id': self.user_id,
+            'fingerprint': self.fingerprint,
+            'amount_debit_cents': self.amount_debit_cents,
+            'amount_credit_cents': self.amount_credit_cents,
+            'balance_cents': self.balance_cents
         }
 
     def format_amount(self) -> str:
@@ -101,33 +161,28 @@ class ESLReceipt(BaseObject):
     def insert_to_db(self) -> None:
         """
         Insert this receipt into the database as well as inserting it into the transactions table, if a transaction.
+        Receipts (and transactions) that already exist are left untouched.
         """
         query = '''INSERT INTO ESLReceipts(Transaction_Number, Date, Description, Memo,
                                            Amount_Debit, Amount_Credit, Balance, Check_Number, 
-                                           Fees, Card_Type, Is_Payment, Is_Transaction, User_id)
-                   VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?);'''
+                                           Fees, Card_Type, Is_Payment, Is_Transaction, User_id, Fingerprint,
+                                           Amount_Debit_Cents, Amount_Credit_Cents, Balance_Cents)
+                   VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+                   ON CONFLICT DO NOTHING;'''
         self.db.commit(query, values=self.to_tuple())
 
-        if self.is_transaction \
-                and self.transaction is not None \
-                and not self.transaction.exists_in_db():
+        if self.is_transaction and self.transaction is not None:
             self.transaction.insert_to_db()
 
     def exists_in_db(self) -> bool:
         """
-        May not work with duplicate transactions on same dates, may want to figure out better query.
         Check to see if this object exists within the db.
         :return: true if in db, false otherwise.
         """
-        query = '''SELECT * 
+        query = '''SELECT id 
                    FROM ESLReceipts 
-                   WHERE Transaction_Number=? AND Date=? AND Description=? 
-                                              AND Memo=? AND Amount_Debit=? 
-                                              AND Amount_Credit=? AND Balance=? 
-                                              AND Check_Number=? AND Fees=? 
-                                              AND Card_Type=? AND Is_Payment=? 
-                                              AND Is_Transaction=? AND User_id=?;'''
-        return len(self.db.fetchall(query, values=self.to_tuple())) > 0
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return len(self.db.fetchall(query, values=(self.user_id, self.fingerprint))) > 0
 
     def get_id(self) -> int:
         """
@@ -136,13 +191,8 @@ class ESLReceipt(BaseObject):
         """
         query = '''SELECT id 
                    FROM ESLReceipts 
-                   WHERE Transaction_Number=? AND Date=? AND Description=? 
-                                              AND Memo=? AND Amount_Debit=? 
-                                              AND Amount_Credit=? AND Balance=? 
-                                              AND Check_Number=? AND Fees=? 
-                                              AND Card_Type=? AND Is_Payment=? 
-                                              AND Is_Transaction=? AND User_id=?;'''
-        return int(self.db.fetchall(query, values=self.to_tuple())[0][0])
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return int(self.db.fetchall(query, values=(self.user_id, self.fingerprint))[0][0])
 
     def get_type(self) -> str:
         """
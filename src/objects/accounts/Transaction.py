@@ -1,7 +1,25 @@
 from objects.interface.dbconn import DB
 from objects.BaseObject import BaseObject
-from objects.accounts import Apple, ESL
 from utils.enums import Tables
+from utils.formatting.formatter import format_amount_to_cents, format_date_to_day_number
+from utils.hashing.hashing import fingerprint
+
+
+def build_transaction_row(date: str, amount: str, card_type: str, merchant: str, description: str,
+                          user_id: int) -> tuple:
+    """
+    Build the row inserted into the 'Transactions' table for a receipt.
+    :param date: The formatted date of the transaction.
+    :param amount: The positive amount of the transaction.
+    :param card_type: The account the transaction was made with.
+    :param merchant: The merchant of the transaction.
+    :param description: The description of the transaction.
+    :param user_id: The id of the current user.
+    :return: A tuple in the same order as Transaction.to_tuple().
+    """
+    return (date, amount, card_type, merchant, description, user_id,
+            fingerprint((date, amount, card_type, merchant, description)), format_amount_to_cents(amount),
+            format_date_to_day_number(date))
 
 
 class Transaction(BaseObject):
@@ -9,37 +27,20 @@ class Transaction(BaseObject):
     Class that will be used to construct a Transaction object.
     """
 
-    def __init__(self, db: DB, receipt: BaseObject, user_id: int) -> None:
+    __slots__ = ('db', 'date', 'amount', 'card_type', 'merchant', 'description', 'user_id', 'fingerprint',
+                 'amount_cents', 'day_number')
+
+    def __init__(self, db: DB, values: tuple) -> None:
         """
         Construct a Transaction.
         :param db: The database connection.
-        :param receipt: The object creating this Transaction.
-        :param user_id: The id of the current user.
+        :param values: The row built by build_transaction_row() for the receipt creating this Transaction.
         """
         super(Transaction, self).__init__()
 
         self.db = db
-        self.date = None
-        self.amount = None
-        self.card_type = None
-        self.merchant = None
-        self.description = None
-        self.user_id = user_id
-        values = receipt.to_dictionary()
-
-        if isinstance(receipt, Apple.AppleReceipt):
-            self.date = values['transaction_date']
-            self.amount = values['amount']
-            self.card_type = values['card_type']
-            self.merchant = values['merchant']
-            self.description = values['description']
-
-        elif isinstance(receipt, ESL.ESLReceipt):
-            self.date = values['date']
-            self.amount = receipt.format_amount()
-            self.card_type = values['card_type']
-            self.merchant = values['memo']
-            self.description = values['description']
+        (self.date, self.amount, self.card_type, self.merchant, self.description, self.user_id, self.fingerprint,
+         self.amount_cents, self.day_number) = values
 
     def __repr__(self) -> repr:
         """
@@ -62,7 +63,8 @@ class Transaction(BaseObject):
                  object corresponds to.
         """
         return [self.date, self.amount, self.card_type,
-                self.merchant, self.description, self.user_id]
+                self.merchant, self.description, self.user_id, self.fingerprint, self.amount_cents,
+                self.day_number]
 
     def to_tuple(self) -> tuple:
         """
@@ -71,7 +73,8 @@ class Transaction(BaseObject):
                  object corresponds to.
         """
         return (self.date, self.amount, self.card_type,
-                self.merchant, self.description, self.user_id)
+                self.merchant, self.description, self.user_id, self.fingerprint, self.amount_cents,
+                self.day_number)
 
     def to_dictionary(self) -> dict:
         """
@@ -85,28 +88,32 @@ class Transaction(BaseObject):
             'card_type': self.card_type,
             'merchant': self.merchant,
             'description': self.description,
-            'user_id': self.description
+            'user_id': self.user_id,
+            'fingerprint': self.fingerprint,
+            'amount_cents': self.amount_cents,
+            'day_number': self.day_number
         }
 
     def insert_to_db(self) -> None:
         """
-        Insert this transaction into the database.
+        Insert this transaction into the database, unless it already exists.
         TODO: Add ESL / Apple ID
         """
-        query = '''INSERT INTO Transactions(Date, Amount, Card_Type, Merchant, Description, User_id)
-                   VALUES(?,?,?,?,?,?);'''
+        query = '''INSERT INTO Transactions(Date, Amount, Card_Type, Merchant, Description, User_id, Fingerprint,
+                                            Amount_Cents, Day_Number)
+                   VALUES(?,?,?,?,?,?,?,?,?)
+                   ON CONFLICT DO NOTHING;'''
         self.db.commit(query, values=self.to_tuple())
 
     def exists_in_db(self) -> bool:
         """
-        May not work with duplicate transactions on same dates, may want to figure out better query.
         Check to see if this object exists within the db.
         :return: true if in db, false otherwise.
         """
-        query = '''SELECT * 
+        query = '''SELECT id 
                    FROM Transactions 
-                   WHERE Date=? AND Amount=? AND Card_Type=? AND Merchant=? AND Description=? AND User_id=?;'''
-        return len(self.db.fetchall(query, values=self.to_tuple())) > 0
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return len(self.db.fetchall(query, values=(self.user_id, self.fingerprint))) > 0
 
     def get_id(self) -> int:
         """
@@ -115,8 +122,8 @@ class Transaction(BaseObject):
         """
         query = '''SELECT id 
                    FROM Transactions 
-                   WHERE Date=? AND Amount=? AND Card_Type=? AND Merchant=? AND Description=? AND User_id=?;'''
-        return int(self.db.fetchall(query, values=self.to_tuple())[0][0])
+                   WHERE User_id=? AND Fingerprint=?;'''
+        return int(self.db.fetchall(query, values=(self.user_id, self.fingerprint))[0][0])
 
     def get_type(self) -> str:
         """
@@ -0,0 +1,139 @@
+import numpy as np
+from utils.enums import Buckets
+
+# Dictionary to contain the Enum of a bucket as a Key, and the numpy unit each date is truncated to as the value.
+BUCKET_UNITS = {
+    Buckets.DAY.name: 'D',
+    Buckets.MONTH.name: 'M',
+    Buckets.YEAR.name: 'Y',
+}
+
+
+class TransactionCache:
+    """
+    A columnar, in-memory copy of a user's transactions, used to answer report queries without the database.
+    Transactions are held in numpy arrays sorted by day, so the transactions between two dates are found with a
+    binary search, and totals are computed from the running total of the amounts. Since each day, month and year
+    is a contiguous run of transactions, the totals per bucket are differences of the running total at the start of
+    each run, which costs time proportional to the number of buckets rather than the number of transactions.
+    """
+
+    def __init__(self, user_id: int, rows: list) -> None:
+        """
+        Construct a Transaction Cache.
+        :param user_id: The id of the user the transactions belong to.
+        :param rows: The user's transactions as (day number, amount in cents, card type, merchant) rows, ordered by day.
+        """
+        self.user_id = user_id
+        day_numbers, cents, card_types, merchants = zip(*rows) if rows else ((), (), (), ())
+
+        # Day numbers count the days since 1970-01-01, which is how numpy stores dates.
+        self.days = np.array(day_numbers, dtype=np.int64).astype('datetime64[D]')
+        self.cents = np.array(cents, dtype=np.int64)
+        self.card_types, self.card_codes = np.unique(np.array(card_types, dtype=str), return_inverse=True)
+        self.merchants, self.merchant_ids = np.unique(np.array(merchants, dtype=str), return_inverse=True)
+
+        # running_cents[i] holds the total of the first i transactions.
+        self.running_cents = np.concatenate(([0], np.cumsum(self.cents)))
+
+        # The index of the first transaction of each day, month and year, along with the name of the bucket.
+        self.runs = {}
+        for bucket, unit in BUCKET_UNITS.items():
+            keys = self.days.astype(f"datetime64[{unit}]")
+            starts = np.flatnonzero(np.concatenate(([len(keys) > 0], keys[1:] != keys[:-1])))
+            self.runs[bucket] = (starts, np.datetime_as_string(keys[starts]).tolist())
+
+    def __len__(self) -> int:
+        """
+        :return: The number of cached transactions.
+        """
+        return len(self.days)
+
+    def get_range(self, dates: tuple) -> (int, int):
+        """
+        Find the transactions between two dates.
+        :param dates: The tuple containing the starting and ending dates. Note: dates[0] - start_date, dates[1] - end_date.
+        :return: The index of the first transaction within the range, and the index after the last.
+        """
+        start_date, end_date = np.array(dates, dtype='datetime64[D]')
+        start = int(np.searchsorted(self.days, start_date, side='left'))
+        end = int(np.searchsorted(self.days, end_date, side='right'))
+        return start, max(start, end)
+
+    def get_count(self, dates: tuple) -> int:
+        """
+        Count the transactions between two dates.
+        :param dates: The tuple containing the starting and ending dates.
+        :return: The number of transactions between the dates.
+        """
+        start, end = self.get_range(dates)
+        return end - start
+
+    def get_total(self, dates: tuple) -> int:
+        """
+        Total the transactions between two dates.
+        :param dates: The tuple containing the starting and ending dates.
+        :return: The total in cents, or None if there are no transactions between the dates.
+        """
+        start, end = self.get_range(dates)
+        if start == end:
+            return None
+        return int(self.running_cents[end] - self.running_cents[start])
+
+    def get_average(self, dates: tuple) -> float:
+        """
+        Average the transactions between two dates.
+        :param dates: The tuple containing the starting and ending dates.
+        :return: The average transaction in cents, or None if there are no transactions between the dates.
+        """
+        start, end = self.get_range(dates)
+        if start == end:
+            return None
+        return int(self.running_cents[end] - self.running_cents[start]) / (end - start)
+
+    def get_totals(self, bucket: Buckets, dates: tuple) -> dict:
+        """
+        Total the transactions between two dates per bucket.
+        :param bucket: The bucket to group the transactions by (day, month, year, or merchant).
+        :param dates: The tuple containing the starting and ending dates.
+        :return: A dictionary containing the totals in cents, ordered by bucket.
+                 Note: days are keyed as YYYY-MM-DD, months as YYYY-MM, and years as YYYY.
+        """
+        start, end = self.get_range(dates)
+        if start == end:
+            return {}
+
+        if bucket.name == Buckets.MERCHANT.name:
+            return self.get_totals_by_code(self.merchants, self.merchant_ids[start:end], self.cents[start:end])
+
+        # Find the runs overlapping the range: the run containing the first transaction, up to the last run starting
+        # before the end of the range. The first and last runs are clipped to the range.
+        run_starts, run_names = self.runs[bucket.name]
+        first = int(np.searchsorted(run_starts, start, side='right')) - 1
+        last = int(np.searchsorted(run_starts, end, side='left'))
+        edges = np.concatenate(([start], run_starts[first + 1:last], [end]))
+        totals = self.running_cents[edges[1:]] - self.running_cents[edges[:-1]]
+        return dict(zip(run_names[first:last], totals.tolist()))
+
+    def get_totals_by_card_type(self, dates: tuple) -> dict:
+        """
+        Total the transactions between two dates per card type.
+        :param dates: The tuple containing the starting and ending dates.
+        :return: A dictionary containing the totals in cents, keyed by card type.
+        """
+        start, end = self.get_range(dates)
+        return self.get_totals_by_code(self.card_types, self.card_codes[start:end], self.cents[start:end])
+
+    @staticmethod
+    def get_totals_by_code(names, codes, cents) -> dict:
+        """
+        Total amounts per code, such as a merchant id.
+        :param names: The name of each code, in code order.
+        :param codes: The code of each transaction.
+        :param cents: The amount of each transaction, in cents.
+        :return: A dictionary containing the totals in cents of the codes that appear, ordered by name.
+        """
+        present = np.bincount(codes, minlength=len(names)) > 0
+        totals = np.zeros(len(names), dtype=np.int64)
+        np.add.at(totals, codes, cents)
+        return dict(zip(names[present].tolist(), totals[present].tolist()))
@@ -0,0 +1,35 @@
+class TransactionStats:
+    """
+    A summary of a user's transactions: the dates of their earliest and latest transactions, how many transactions
+    they have, and the years they have transactions within. Used by the menus to check for data without querying
+    the database on every prompt.
+    """
+
+    __slots__ = ('user_id', 'earliest_date', 'latest_date', 'count', 'years', 'year_set')
+
+    def __init__(self, user_id: int, bounds: tuple, year_counts: list) -> None:
+        """
+        Construct a Transaction Stats.
+        :param user_id: The id of the user the transactions belong to.
+        :param bounds: The dates of the user's earliest and latest transactions, or (None, None) without transactions.
+        :param year_counts: The user's (year, number of transactions) rows, ordered by year.
+        """
+        self.user_id = user_id
+        self.earliest_date, self.latest_date = bounds
+        self.count = sum(count for _, count in year_counts)
+        self.years = tuple(year for year, _ in year_counts)
+        self.year_set = frozenset(self.years)
+
+    def __len__(self) -> int:
+        """
+        :return: The number of transactions the user has.
+        """
+        return self.count
+
+    def has_year(self, year: str) -> bool:
+        """
+        Determine if the user has transactions within a year.
+        :param year: The year to check, in the YYYY format.
+        :return: True if the user has transactions within the year, False otherwise.
+        """
+        return year in self.year_set
@@ -0,0 +1,141 @@
+import os
+from objects.BaseObject import BaseObject
+from objects.interface.dbconn import DB
+from utils.hashing.hashing import file_hash
+from utils.logger.logger import log
+
+
+class File(BaseObject):
+    """
+    Class that will be used to construct a File object, the manifest entry of a csv file that has been inserted into
+    the database. The manifest allows files that have not changed since their last upload to be skipped without
+    reading them.
+    """
+
+    def __init__(self, db: DB, path: str, user_id: int) -> None:
+        """
+        Construct a File.
+        :param db: The database connection.
+        :param path: The path of the file.
+        :param user_id: The id of the user the file belongs to.
+        """
+        super(File, self).__init__()
+        self.db = db
+        self.path = os.path.abspath(path)
+        self.user_id = user_id
+
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.modified = stat.st_mtime_ns
+        self.hash = None
+        self.row_count = 0
+
+    def __repr__(self) -> repr:
+        """
+        Inherit the parent object's __repr__.
+        :return: the __repr__ of this object.
+        """
+        return super(File, self).__repr__()
+
+    def __str__(self) -> str:
+        """
+        Inherit the parent object's __str__.
+        :return: the __str__ of this object.
+        """
+        return super(File, self).__str__()
+
+    def to_list(self) -> list:
+        """
+        Create a list representation of this object.
+        :return: a list containing the components corresponding to the table this
+                 object corresponds to.
+        """
+        return [self.path, self.size, self.modified, self.hash, self.row_count, self.user_id]
+
+    def to_tuple(self) -> tuple:
+        """
+        Create a tuple representation of this object.
+        :return: a tuple containing the components corresponding to the table this
+                 object corresponds to.
+        """
+        return tuple(self.to_list())
+
+    def to_dictionary(self) -> dict:
+        """
+        Create a dictionary representation of this object.
+        :return: a dictionary containing the components corresponding to the table this
+                 object corresponds to.
+        """
+        return {
+            'path': self.path,
+            'size': self.size,
+            'modified': self.modified,
+            'hash': self.hash,
+            'row_count': self.row_count,
+            'user_id': self.user_id
+        }
+
+    def is_unchanged(self) -> bool:
+        """
+        Determine if this file has already been inserted and has not changed since.
+        Files with the same size and modification time are skipped without being read. Files that were only touched
+        or copied again are hashed, and skipped if their contents match the previous upload.
+        :return: True if the file does not need to be inserted again, False otherwise.
+        """
+        query = '''SELECT Size, Modified, Hash, Row_Count
+                   FROM CSVFiles
+                   WHERE User_id=? AND Path=?;'''
+        manifest = self.db.fetchall(query, values=(self.user_id, self.path))
+        if len(manifest) == 0:
+            return False
+
+        size, modified, previous_hash, row_count = manifest[0]
+        if size == self.size and modified == self.modified:
+            return True
+        if size != self.size:
+            return False
+
+        self.hash = file_hash(self.path)
+        if self.hash != previous_hash:
+            return False
+
+        # Record the new modification time so the next upload can skip this file without hashing it.
+        self.row_count = row_count
+        self.insert_to_db()
+        return True
+
+    def insert_to_db(self) -> None:
+        """
+        Insert this file into the database, replacing the previous manifest entry of the same path.
+        """
+        if self.hash is None:
+            self.hash = file_hash(self.path)
+
+        query = '''INSERT INTO CSVFiles(Path, Size, Modified, Hash, Row_Count, User_id)
+                   VALUES(?,?,?,?,?,?)
+                   ON CONFLICT(User_id, Path) DO UPDATE SET Size=excluded.Size,
+                                                            Modified=excluded.Modified,
+                                                            Hash=excluded.Hash,
+                                                            Row_Count=excluded.Row_Count;'''
+        self.db.commit(query, values=self.to_tuple())
+        log(f"{self.path} has been recorded as uploaded for User:{self.user_id}.", level="debug")
+
+    def exists_in_db(self) -> bool:
+        """
+        Check to see if this object exists within the db.
+        :return: true if in db, false otherwise.
+        """
+        query = '''SELECT id
+                   FROM CSVFiles
+                   WHERE User_id=? AND Path=?;'''
+        return len(self.db.fetchall(query, values=(self.user_id, self.path))) > 0
+
+    def get_id(self) -> int:
+        """
+        Retrieve the id of this object from the database.
+        :return: The id associated with a File (CSV) object.
+        """
+        query = '''SELECT id
+                   FROM CSVFiles
+                   WHERE User_id=? AND Path=?;'''
+        return int(self.db.fetchall(query, values=(self.user_id, self.path))[0][0])
@@ -1,9 +1,296 @@
+import atexit
+import os
 import sqlite3
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import date
 from sqlite3 import Error
+from time import perf_counter
 from utils import globals
+from utils.exceptions import InvalidDatabaseProfile, UnknownQuery
+from utils.formatting.formatter import format_date_to_day_number
 from utils.logger.logger import log
 
 
+class Connection(sqlite3.Connection):
+    """
+    A sqlite3 connection that keeps track of how deeply nested its open transaction() blocks are,
+    since a single connection is shared by every DB object within a thread.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super(Connection, self).__init__(*args, **kwargs)
+        self.transaction_depth = 0
+        self.pragma_version = -1
+
+
+class ConnectionManager:
+    """
+    Process-wide manager that hands out long-lived connections, one per database file per thread,
+    instead of opening and closing a new connection for every query.
+    """
+
+    def __init__(self, pragmas: dict = None) -> None:
+        """
+        Construct the connection manager.
+        :param pragmas: The pragmas to apply to every connection. Note: The form of the dictionary is { pragma : value }.
+        """
+        self.pragmas = dict(pragmas) if pragmas is not None else {}
+        self.profile = None
+        self.temporary_profiles = []
+        self.pragma_version = 0
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+        self.opened = 0
+        self.reused = 0
+
+    def thread_connections(self) -> dict:
+        """
+        Retrieve the connections owned by the current thread.
+        :return: A dictionary containing the database files as keys, and their connection as the value.
+        """
+        if not hasattr(self.local, 'connections'):
+            self.local.connections = {}
+        return self.local.connections
+
+    def apply_pragmas(self, conn: Connection) -> None:
+        """
+        Apply the configured pragmas to a connection if they have changed since they were last applied.
+        Pragmas such as 'journal_mode' cannot be changed within a transaction, so a connection with an open transaction
+        picks up the change once the transaction has finished.
+        :param conn: The connection to configure.
+        """
+        if conn.pragma_version == self.pragma_version or conn.in_transaction:
+            return
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value};")
+        conn.pragma_version = self.pragma_version
+
+    def set_pragmas(self, pragmas: dict) -> None:
+        """
+        Update the pragmas applied to every connection. Connections pick up the change the next time they are handed out.
+        :param pragmas: The pragmas to add or replace. Note: The form of the dictionary is { pragma : value }.
+        """
+        with self.lock:
+            self.use_pragmas(pragmas)
+
+    def use_pragmas(self, pragmas: dict) -> None:
+        """
+        Update the pragmas applied to every connection, while the lock is already held.
+        :param pragmas: The pragmas to add or replace. Note: The form of the dictionary is { pragma : value }.
+        """
+        self.pragmas.update(pragmas)
+        self.pragma_version += 1
+
+    def set_profile(self, profile: str) -> None:
+        """
+        Switch every connection to one of the tuning profiles within DATABASE_PROFILES. While a temporary profile is
+        in use, the switch takes effect once every temporary profile has been removed.
+        :param profile: The name of the profile.
+        :raises InvalidDatabaseProfile: Exception raised when the profile does not exist.
+        """
+        if profile not in globals.DATABASE_PROFILES:
+            raise InvalidDatabaseProfile(profile)
+        with self.lock:
+            self.profile = profile
+            if not self.temporary_profiles:
+                self.use_pragmas(globals.DATABASE_PROFILES[profile])
+        log(f"Database profile set to '{profile}'.", level="debug")
+
+    def push_profile(self, profile: str) -> None:
+        """
+        Switch every connection to a tuning profile until it is removed by pop_profile(). Temporary profiles may
+        overlap, such as when two threads insert files at once: the most recent one still in use is applied, and the
+        profile set by set_profile() is only restored once all of them have been removed.
+        :param profile: The name of the profile.
+        :raises InvalidDatabaseProfile: Exception raised when the profile does not exist.
+        """
+        if profile not in globals.DATABASE_PROFILES:
+            raise InvalidDatabaseProfile(profile)
+        with self.lock:
+            self.temporary_profiles.append(profile)
+            self.use_pragmas(globals.DATABASE_PROFILES[profile])
+        log(f"Database profile '{profile}' in use.", level="debug")
+
+    def pop_profile(self, profile: str) -> None:
+        """
+        Remove a temporary profile added by push_profile(), switching every connection to the most recent temporary
+        profile still in use, or to the profile set by set_profile() if there are none left.
+        :param profile: The name of the profile.
+        """
+        with self.lock:
+            position = len(self.temporary_profiles) - 1 - self.temporary_profiles[::-1].index(profile)
+            del self.temporary_profiles[position]
+            current = self.temporary_profiles[-1] if self.temporary_profiles else self.profile
+            self.use_pragmas(globals.DATABASE_PROFILES[current])
+        log(f"Database profile '{profile}' no longer in use, switched to '{current}'.", level="debug")
+
+    def get_connection(self, db_file: str) -> Connection:
+        """
+        Retrieve the current thread's connection to a database, opening it on first use.
+        :param db_file: The database to connect to.
+        :return: The connection to the database.
+        """
+        key = os.path.abspath(db_file)
+        connections = self.thread_connections()
+        conn = connections.get(key)
+
+        if conn is None:
+            conn = sqlite3.connect(db_file, factory=Connection, check_same_thread=False,
+                                   cached_statements=globals.STATEMENT_CACHE_SIZE)
+            connections[key] = conn
+            with self.lock:
+                self.connections.append(conn)
+                self.opened += 1
+        else:
+            with self.lock:
+                self.reused += 1
+
+        self.apply_pragmas(conn)
+        return conn
+
+    @contextmanager
+    def connection(self, db_file: str):
+        """
+        Context manager that provides a DB object backed by the current thread's connection.
+        :param db_file: The database to connect to.
+        """
+        db = DB(db_file)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def close_connection(self, db_file: str) -> None:
+        """
+        Close the current thread's connection to a database.
+        :param db_file: The database to disconnect from.
+        """
+        conn = self.thread_connections().pop(os.path.abspath(db_file), None)
+        if conn is not None:
+            with self.lock:
+                self.connections.remove(conn)
+            conn.close()
+
+    def close_all(self) -> None:
+        """
+        Close every connection opened by any thread.
+        """
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+        self.local = threading.local()
+        log(f"Database connections opened: {self.opened}, reused: {self.reused}.", level="debug")
+
+    def stats(self) -> dict:
+        """
+        Retrieve the counters used to verify that connections are being reused.
+        :return: A dictionary containing the number of connections opened, reused, and currently open.
+        """
+        with self.lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'open': len(self.connections)
+            }
+
+
+class QueryRegistry:
+    """
+    Process-wide registry of named, parameterized statements. Records how many times each statement runs, along with a
+    histogram of how long it takes, so that the hot queries can be found.
+    """
+
+    def __init__(self) -> None:
+        """
+        Construct the query registry.
+        """
+        self.queries = {}
+        self.calls = {}
+        self.seconds = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def register(self, name: str, query: str) -> str:
+        """
+        Register a statement under a name. Registering a name again replaces its statement but keeps its statistics.
+        :param name: The name of the statement.
+        :param query: The statement, with '?' placeholders for its values.
+        :return: The name of the statement.
+        """
+        with self.lock:
+            self.queries[name] = query
+            self.calls.setdefault(name, 0)
+            self.seconds.setdefault(name, 0.0)
+            self.histograms.setdefault(name, [0] * (len(globals.LATENCY_BUCKETS) + 1))
+        return name
+
+    def get_query(self, name: str) -> str:
+        """
+        Retrieve a registered statement.
+        :param name: The name of the statement.
+        :raises UnknownQuery: Exception raised when no statement has been registered under the name.
+        :return: The statement.
+        """
+        query = self.queries.get(name)
+        if query is None:
+            raise UnknownQuery(name)
+        return query
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record a run of a statement.
+        :param name: The name of the statement.
+        :param seconds: The number of seconds the statement took.
+        """
+        bucket = bisect_left(globals.LATENCY_BUCKETS, seconds * 1000)
+        with self.lock:
+            self.calls[name] += 1
+            self.seconds[name] += seconds
+            self.histograms[name][bucket] += 1
+
+    def stats(self) -> dict:
+        """
+        Retrieve the statistics of every statement that has run, ordered by the total time spent running it.
+        :return: A dictionary containing the names of the statements as keys, and a dictionary of their number of
+                 calls, total milliseconds, and latency histogram as the value.
+                 Note: the histogram is keyed by the upper bound of each bucket, such as '<=1ms', and '>500ms'.
+        """
+        labels = [f"<={bound}ms" for bound in globals.LATENCY_BUCKETS] + [f">{globals.LATENCY_BUCKETS[-1]}ms"]
+        with self.lock:
+            names = sorted((name for name in self.calls if self.calls[name] > 0), key=lambda name: -self.seconds[name])
+            return {
+                name: {
+                    'calls': self.calls[name],
+                    'total_ms': self.seconds[name] * 1000,
+                    'histogram': {label: count for label, count in zip(labels, self.histograms[name]) if count > 0}
+                } for name in names
+            }
+
+    def log_stats(self) -> None:
+        """
+        Log the statistics of every statement that has run.
+        """
+        for name, stats in self.stats().items():
+            histogram = ", ".join(f"{label}: {count}" for label, count in stats['histogram'].items())
+            log(f"Query {name}: {stats['calls']} calls, {stats['total_ms']:.1f} ms ({histogram}).", level="debug")
+
+
+# The query registry shared by the whole process.
+query_registry = QueryRegistry()
+for query_name, statement in globals.QUERIES.items():
+    query_registry.register(query_name, statement)
+atexit.register(query_registry.log_stats)
+
+# The connection manager shared by the whole process.
+connection_manager = ConnectionManager(pragmas=globals.DATABASE_PROFILES[globals.DATABASE_PROFILE])
+connection_manager.profile = globals.DATABASE_PROFILE
+atexit.register(connection_manager.close_all)
+
+
 class DB:
     """
     This class will serve as the interface between client and the database.
@@ -12,19 +299,27 @@ class DB:
     def __init__(self, db_file) -> None:
         """
         Set up a connection to the database.
+        The connection is shared with every other DB object on the same thread (see ConnectionManager).
         :param db_file: The database to connect to.
         """
         self.conn = None
         try:
-            self.conn = sqlite3.connect(db_file)
+            self.conn = connection_manager.get_connection(db_file)
         except Error as e:
             log(str(e), level="error")
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
     def close(self) -> None:
         """
-        Close the connection to the database
+        Release the connection to the database.
+        The underlying connection is kept open by the connection manager so that it can be reused.
         """
-        self.conn.close()
+        pass
 
     def commit(self, query: str, values: tuple = None) -> None:
         """
@@ -41,7 +336,59 @@ class DB:
 
         cursor.close()
         # log("Query committed.", level="debug")
-        self.conn.commit()
+        if self.conn.transaction_depth == 0:
+            self.conn.commit()
+
+    def execute_many(self, query: str, values: list) -> int:
+        """
+        Execute a query once for every set of values without committing.
+        Intended to be used within a transaction().
+        :param query: The query to execute.
+        :param values: The list of value tuples associated with the query.
+        :return: The number of rows modified by the query.
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany(query, values)
+        row_count = cursor.rowcount
+        cursor.close()
+        return row_count
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group every query executed within the block into a single transaction.
+        The transaction is committed once when the outermost block exits, or rolled back if an exception is raised.
+        """
+        if self.conn.transaction_depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self.conn.transaction_depth += 1
+        try:
+            yield self
+        except Exception:
+            self.conn.transaction_depth -= 1
+            if self.conn.transaction_depth == 0:
+                self.conn.rollback()
+            raise
+        self.conn.transaction_depth -= 1
+        if self.conn.transaction_depth == 0:
+            self.conn.commit()
+
+    @contextmanager
+    def profile(self, profile: str):
+        """
+        Switch to a tuning profile for the duration of the block, such as 'fast-ingest' around a bulk import, then
+        switch back. Blocks may overlap across threads; the previous profile is restored once the last one has ended.
+        Note: profiles apply to every connection of the process, not only this one.
+        :param profile: The name of the profile.
+        :raises InvalidDatabaseProfile: Exception raised when the profile does not exist.
+        """
+        connection_manager.push_profile(profile)
+        connection_manager.apply_pragmas(self.conn)
+        try:
+            yield self
+        finally:
+            connection_manager.pop_profile(profile)
+            connection_manager.apply_pragmas(self.conn)
 
     def fetchall(self, query: str, values: tuple = None) -> list:
         """
@@ -70,19 +417,71 @@ class DB:
             self.commit(table)
             # log(f"Table created.", level="debug")
 
+    def setup_indexes(self) -> None:
+        """
+        Setup the database's indexes.
+        """
+        for index in globals.INDEXES:
+            self.commit(index)
+
+    def setup_triggers(self) -> None:
+        """
+        Setup the database's triggers.
+        """
+        for trigger in globals.TRIGGERS:
+            self.commit(trigger)
+
+    def fetch_named(self, name: str, values: tuple = None) -> list:
+        """
+        Perform a fetchall from a statement of the query registry.
+        :param name: The name of the statement.
+        :param values: The values associated with the statement.
+        :raises UnknownQuery: Exception raised when the statement has not been registered.
+        :return: a list of tuples from the query.
+        """
+        query = query_registry.get_query(name)
+        start = perf_counter()
+        data = self.fetchall(query, values=values)
+        query_registry.record(name, perf_counter() - start)
+        return data
+
+    def commit_named(self, name: str, values: tuple = None) -> None:
+        """
+        Commit a statement of the query registry.
+        :param name: The name of the statement.
+        :param values: The values associated with the statement.
+        :raises UnknownQuery: Exception raised when the statement has not been registered.
+        """
+        query = query_registry.get_query(name)
+        start = perf_counter()
+        self.commit(query, values=values)
+        query_registry.record(name, perf_counter() - start)
+
+    def execute_many_named(self, name: str, values: list) -> int:
+        """
+        Execute a statement of the query registry once for every set of values without committing.
+        :param name: The name of the statement.
+        :param values: The list of value tuples associated with the statement.
+        :raises UnknownQuery: Exception raised when the statement has not been registered.
+        :return: The number of rows modified by the statement.
+        """
+        query = query_registry.get_query(name)
+        start = perf_counter()
+        row_count = self.execute_many(query, values)
+        query_registry.record(name, perf_counter() - start)
+        return row_count
+
     def fetch_all_dates(self) -> list:
         """
-        Return all transactions ever made.
+        Return all transactions ever made, up to today.
         """
-        query = """SELECT * 
-                   FROM Transactions 
-                   WHERE Date 
-                   BETWEEN DATE('1970-01-01') AND DATE('now') Order By Date;"""
-        return self.fetchall(query)
+        return self.fetch_named("SELECT_ALL_TRANSACTIONS", values=(format_date_to_day_number(str(date.today())),))
 
     def fetch_dates(self, date1, date2) -> list:
-        query = f"""SELECT * 
-                    FROM Transactions 
-                    WHERE Date 
-                    BETWEEN DATE('{date1}') AND DATE('{date2}');"""
-        return self.fetchall(query)
+        """
+        Return all transactions made between two dates.
+        :param date1: The starting date.
+        :param date2: The ending date.
+        """
+        return self.fetch_named("SELECT_TRANSACTIONS_BETWEEN_DATES",
+                                values=(format_date_to_day_number(date1), format_date_to_day_number(date2)))
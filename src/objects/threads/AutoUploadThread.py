@@ -0,0 +1,55 @@
+import queue
+from objects.threads.Thread import Thread
+from objects.threads.UploadThread import UploadThread
+from objects.user.User import User
+from utils.logger.logger import log
+
+
+class AutoUploadThread(Thread):
+    """
+    This class will be used to spawn a thread that uploads the files placed within the 'Upload' folder on behalf of
+    the signed in user, as soon as the folder thread reports them.
+    Uploads are queued and run one at a time on this thread, so that the folder thread never waits on the database.
+    """
+
+    def __init__(self):
+        """
+        Initialize the Auto Upload Thread.
+        """
+        super(AutoUploadThread, self).__init__()
+        self.requests = queue.Queue()
+
+    def request(self, user: User) -> None:
+        """
+        Queue an upload of the 'Upload' folder on behalf of a user, without waiting for it to run.
+        :param user: The user to upload the files for.
+        """
+        self.requests.put(user)
+
+    def run(self) -> None:
+        """
+        Run the queued uploads in the order they were requested.
+        Requests made while an upload was running are covered by a single upload, as every upload moves all of the
+        files found within the 'Upload' folder.
+        """
+        while self.running:
+            users = [self.requests.get()]
+            while not self.requests.empty():
+                users.append(self.requests.get())
+
+            for index, user in enumerate(users):
+                if user is None:
+                    return
+                if index + 1 < len(users) and users[index + 1] is user:
+                    continue
+                try:
+                    UploadThread(user, quiet=True).run()
+                except Exception as e:
+                    log(f"User:{user.id} auto upload failed: {e}", level="error")
+
+    def stop(self) -> None:
+        """
+        Tell this thread to stop executing, once the upload that is running (if any) has finished.
+        """
+        super(AutoUploadThread, self).stop()
+        self.requests.put(None)
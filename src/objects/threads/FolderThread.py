@@ -1,6 +1,25 @@
 import os
 from objects.threads.Thread import Thread
-from utils.globals import UPLOAD_FOLDER, FOLDER_UPLOADS
+from objects.watchers.Watcher import Watcher
+from objects.watchers.InotifyWatcher import InotifyWatcher, inotify_is_available
+from objects.watchers.PollingWatcher import PollingWatcher
+from utils.globals import UPLOAD_FOLDER, FOLDER_UPLOADS, FOLDER_POLL_INTERVAL
+from utils.logger.logger import log
+
+
+def create_watcher(folders: list, interval: float = FOLDER_POLL_INTERVAL) -> Watcher:
+    """
+    Create the watcher best suited to this platform.
+    :param folders: The folders to watch.
+    :param interval: The number of seconds between scans if the polling watcher has to be used.
+    :return: An inotify watcher on Linux, or a polling watcher otherwise.
+    """
+    if inotify_is_available():
+        try:
+            return InotifyWatcher(folders)
+        except OSError as e:
+            log(f"Unable to watch the upload folders with inotify, falling back to polling: {e}", level="warning")
+    return PollingWatcher(folders, interval)
 
 
 class FolderThread(Thread):
@@ -9,30 +28,62 @@ class FolderThread(Thread):
     The main purpose of this thread is to make sure the 'Upload' directory will always
     be available (while the program is running), even if the user were to accidentally, or intentionally,
     delete the directory.
+    The thread sleeps until the watcher reports a change, and can notify a callback when new csv files are placed
+    within the upload folders.
     """
 
-    def __init__(self):
+    def __init__(self, on_upload=None, interval: float = FOLDER_POLL_INTERVAL):
         """
         Initialize the Folder Thread.
+        :param on_upload: Optional function called with the list of new csv files found within the upload folders.
+        :param interval: The number of seconds between scans if the polling watcher has to be used.
         """
         super(FolderThread, self).__init__()
+        self.on_upload = on_upload
+        self.interval = interval
+        self.watcher = None
+
+    def create_folders(self) -> None:
+        """
+        Create the required upload directories if they don't exist yet, or if the user were to remove them.
+        """
+        if not os.path.isdir(UPLOAD_FOLDER):
+            os.mkdir(UPLOAD_FOLDER)
+        for folder in FOLDER_UPLOADS:
+            if not os.path.isdir(folder):
+                os.mkdir(folder)
 
     def run(self) -> None:
         """
         Function to create the folders that will be used for uploading the user's data into
-        the application.
+        the application, recreating them whenever the watcher reports a change.
         """
+        self.create_folders()
+        folders = [UPLOAD_FOLDER] + FOLDER_UPLOADS
+        self.watcher = create_watcher(folders, self.interval)
+        log(f"Watching the upload folders with {type(self.watcher).__name__}.", level="debug")
+
         while self.running:
-            # Create the required upload directories
-            for folder in FOLDER_UPLOADS:
-                if not os.path.isdir(folder):
-                    # check to see if the upload folder still exists if user were to remove it, or it doesn't exist yet.
-                    if not os.path.isdir(UPLOAD_FOLDER):
-                        os.mkdir(UPLOAD_FOLDER)
-                    os.mkdir(folder)
+            changes = self.watcher.wait()
+            if not self.running:
+                break
+
+            self.create_folders()
+            self.watcher.watch(folders)
+
+            # Files that were already moved by a previous upload are ignored.
+            uploads = [file for file in changes if file.endswith(".csv") and os.path.isfile(file)
+                       and os.path.dirname(file) in FOLDER_UPLOADS]
+            if uploads and self.on_upload is not None:
+                self.on_upload(uploads)
+
+        # The watcher is only released here, once this thread no longer waits on it.
+        self.watcher.release()
 
     def stop(self):
         """
-        Tell this thread to stop executing.
+        Tell this thread to stop executing, waking it up if it is waiting on the watcher.
         """
         super(FolderThread, self).stop()
+        if self.watcher is not None:
+            self.watcher.close()
@@ -1,11 +1,14 @@
 import os
 import shutil
+import threading
 from objects.threads.Thread import Thread
 from objects.user.User import User
 from objects.interface.dbconn import DB
 import utils.globals as _globals
+from utils.logger.logger import log
 from utils.print import print_message, print_error
 from utils.builders.folderbuilder import get_list_of_files, insert_files
+from utils.importers.importers import detect_importer
 
 
 class UploadThread(Thread):
@@ -13,22 +16,53 @@ class UploadThread(Thread):
     This class will be used to spawn a thread that will monitor the 'Upload' directory found within the project.
     This thread will redirect the contents from the 'Upload' folder to the user-specific subdirectory found within
     the 'Users' directory.
+    Only one upload runs at a time, whether it was started from the menus or by the auto upload thread, so that two
+    uploads never move or insert the same files.
     """
 
-    def __init__(self, user: User):
+    # Lock held for the duration of every upload.
+    lock = threading.Lock()
+
+    def __init__(self, user: User, quiet: bool = False):
         """
         Initialize the Upload Thread.
         :param user: The current user.
+        :param quiet: Boolean to determine whether the outcome of the upload is logged rather than printed, such as
+                      when it runs in the background while a menu is waiting on the user's input.
         """
         super(UploadThread, self).__init__()
         self.user = user
+        self.quiet = quiet
         self.user_directory = f"{_globals.USERS_FOLDER}/users/{self.user.id}"
 
+    def report(self, message: str, error: bool = False) -> None:
+        """
+        Tell the user about the progress of the upload, or log it if the upload is quiet.
+        :param message: The message to report.
+        :param error: Boolean to determine whether the message is an error.
+        """
+        if self.quiet:
+            log(f"User:{self.user.id} auto upload: {message}", level="warning" if error else "info")
+        elif error:
+            print_error(message)
+        else:
+            print_message(message)
+
     def run(self) -> None:
         """
         Upload the files from the Upload folder to the Users folder.
         Once moved, the files are then inserted into the database.
         """
+        with UploadThread.lock:
+            self.upload()
+
+        self.stop()
+
+    def upload(self) -> None:
+        """
+        Move the files from the Upload folder to the user's folder, and insert them into the database.
+        Note: UploadThread.lock must be held.
+        """
         files = get_list_of_files(_globals.UPLOAD_FOLDER, ".csv")
         files_have_been_moved = False
 
@@ -40,33 +74,43 @@ class UploadThread(Thread):
         if not os.path.isdir(self.user_directory):
             os.mkdir(self.user_directory)
 
-        # Move the files from the Upload folder to the User folder
+        # Move the files from the Upload folder to the folder of their account within the User folder.
+        # The account is detected from the header of each file, regardless of the folder it was placed in.
+        unsupported_files = []
         for file in files:
-            head, file_name = os.path.split(file)
-            directory = "ESL" if "ESL" in head else "Apple"
-            shutil.move(file, f"{self.user_directory}/{directory}/{file_name}")
+            importer, _ = detect_importer(file)
+            if importer is None:
+                self.report(f"'{os.path.basename(file)}' is not a supported export and has not been uploaded.",
+                            error=True)
+                unsupported_files.append(file)
+                continue
+
+            account_directory = f"{self.user_directory}/{importer.account}"
+            os.makedirs(account_directory, exist_ok=True)
+            shutil.move(file, f"{account_directory}/{os.path.basename(file)}")
             files_have_been_moved = True
 
-        # Delete the folders within the Upload folder to remove any subdirectories.
-        # The folder thread will create them again.
+        # Delete the folders within the Upload folder to remove any subdirectories, keeping the folders that still
+        # contain unsupported files. The folder thread will create them again.
         for folder in _globals.FOLDER_UPLOADS:
-            shutil.rmtree(folder)
+            if not any(file.startswith(folder + os.sep) for file in unsupported_files):
+                shutil.rmtree(folder, ignore_errors=True)
 
         # Get all of the files within the user's directory, and insert them into the database.
+        # Files that were inserted by a previous upload and haven't changed are skipped.
         if files_have_been_moved:
-            print_message("Uploading files...")
+            self.report("Uploading files...")
             files = get_list_of_files(self.user_directory, ".csv")
             db = DB(_globals.DATABASE)
             upload_successful = insert_files(db, files, self.user.id)
             db.close()
             if upload_successful:
-                print_message("Data has successfully been uploaded. Upload is now complete.")
+                self.report("Data has successfully been uploaded. Upload is now complete.")
             else:
-                print_error("Data has already been uploaded. Please upload new data.")
+                self.report("Data has already been uploaded. Please upload new data.", error=True)
         else:
-            print_error("Nothing to upload. Please make sure contents are placed within the 'Upload' directory.")
-
-        self.stop()
+            self.report("Nothing to upload. Please make sure contents are placed within the 'Upload' directory.",
+                        error=True)
 
     def stop(self) -> None:
         """
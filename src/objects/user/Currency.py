@@ -1,5 +1,6 @@
+import threading
 from objects.BaseObject import BaseObject
-from objects.interface.dbconn import DB
+from objects.interface.dbconn import DB, query_registry
 import utils.globals as _globals
 from utils.enums import Tables
 from utils.logger.logger import log
@@ -80,6 +81,11 @@ class Currency(BaseObject):
         Retrieve the id of this object from the database.
         :return: The id associated with a Currency object.
         """
+        _, by_acronym = get_currencies()
+        row = by_acronym.get(self.acronym)
+        if row is not None and row[1:] == self.to_tuple():
+            return row[0]
+
         query = '''SELECT id 
                    FROM Currencies 
                    WHERE Acronym=? AND Name=? AND Symbol=?'''
@@ -93,18 +99,73 @@ class Currency(BaseObject):
         return Tables.CURRENCY.name
 
 
+# Command used to load every currency
+SELECT_CURRENCIES = '''SELECT id, Acronym, Name, Symbol
+                       FROM Currencies;'''
+
+query_registry.register("SELECT_CURRENCIES", SELECT_CURRENCIES)
+
+# The currencies of the database, keyed by id and by acronym. Loaded once, on first use.
+_currencies_by_id = None
+_currencies_by_acronym = None
+_currencies_lock = threading.Lock()
+
+# Incremented on every invalidation, so that currencies loaded while they were being reloaded are not kept.
+_generation = 0
+
+
+def load_currencies() -> (dict, dict):
+    """
+    Load every currency of the database into the currency maps, replacing any previous copy.
+    :return: A tuple containing the dictionaries of (id, acronym, name, symbol) rows, keyed by id and by acronym.
+    """
+    global _currencies_by_id, _currencies_by_acronym
+    with _currencies_lock:
+        generation = _generation
+
+    db = DB(_globals.DATABASE)
+    rows = db.fetch_named("SELECT_CURRENCIES")
+    db.close()
+
+    by_id = {row[0]: row for row in rows}
+    by_acronym = {row[1]: row for row in rows}
+    with _currencies_lock:
+        if generation == _generation:
+            _currencies_by_id, _currencies_by_acronym = by_id, by_acronym
+    log(f"{len(rows)} currencies have been loaded.", level="debug")
+    return by_id, by_acronym
+
+
+def get_currencies() -> (dict, dict):
+    """
+    Retrieve the currency maps, loading them if they were invalidated or have not been loaded yet.
+    :return: A tuple containing the dictionaries of (id, acronym, name, symbol) rows, keyed by id and by acronym.
+    """
+    with _currencies_lock:
+        by_id, by_acronym = _currencies_by_id, _currencies_by_acronym
+    return (by_id, by_acronym) if by_id is not None else load_currencies()
+
+
+def invalidate_currencies() -> None:
+    """
+    Discard the currency maps after the currencies of the database have changed. They are reloaded the next time
+    they are needed.
+    """
+    global _currencies_by_id, _currencies_by_acronym, _generation
+    with _currencies_lock:
+        _generation += 1
+        _currencies_by_id = _currencies_by_acronym = None
+
+
 def get_currency(acronym: str) -> Currency:
     """
     Retrieve a currency object from the database.
     :param acronym: The acronym associated with a currency (USD, EUR, JPY, etc.)
     :return: A currency object.
     """
-    db = DB(_globals.DATABASE)
-    query = """SELECT Acronym, Name, Symbol 
-                FROM Currencies
-                WHERE Acronym=?"""
-    values = list(db.fetchall(query, values=(acronym.upper(),))[0])
-    currency = Currency(db, values=values)
+    _, by_acronym = get_currencies()
+    values = list(by_acronym[acronym.upper()][1:])
+    currency = Currency(DB(_globals.DATABASE), values=values)
     return currency
 
 
@@ -114,13 +175,8 @@ def get_currency_symbol(currency_id: int) -> str:
     :param currency_id: The id of the currency to retrieve the symbol for.
     :return: The symbol associated with a currency.
     """
-    db = DB(_globals.DATABASE)
-    query = """SELECT Symbol
-               FROM Currencies
-               WHERE id=?"""
-    symbol = db.fetchall(query, values=(currency_id,))
-    db.close()
-    return symbol[0][0]
+    by_id, _ = get_currencies()
+    return by_id[currency_id][3]
 
 
 def get_currency_acronym(currency_id: int) -> str:
@@ -129,13 +185,8 @@ def get_currency_acronym(currency_id: int) -> str:
     :param currency_id: The id of the currency to retrieve the symbol for.
     :return: The acronym associated with a currency.
     """
-    db = DB(_globals.DATABASE)
-    query = """SELECT Acronym
-               FROM Currencies
-               WHERE id=?"""
-    acronym = db.fetchall(query, values=(currency_id,))
-    db.close()
-    return acronym[0][0]
+    by_id, _ = get_currencies()
+    return by_id[currency_id][1]
 
 
 def is_valid_currency(currency_acronym: str) -> bool:
@@ -144,13 +195,8 @@ def is_valid_currency(currency_acronym: str) -> bool:
     :param currency_acronym: The currency to check.
     :return: True if the currency exists, False otherwise.
     """
-    db = DB(_globals.DATABASE)
-    query = """SELECT *
-               FROM Currencies
-               WHERE Acronym=?;"""
-    validity = len(db.fetchall(query, values=(currency_acronym.upper(),))) > 0
-    db.close()
-    return validity
+    _, by_acronym = get_currencies()
+    return currency_acronym.upper() in by_acronym
 
 
 def get_currency_from_input() -> str:
@@ -1,5 +1,6 @@
 from datetime import datetime
 from objects.BaseObject import BaseObject
+from utils.cache.cache import get_transaction_stats, invalidate_transaction_cache
 from objects.interface.dbconn import DB
 from utils.enums import Tables
 from utils.logger.logger import log
@@ -136,6 +137,7 @@ class User(BaseObject):
         Sign a user out of the application.
         """
         self.is_signed_in = False
+        invalidate_transaction_cache(self.id)
         self.db.close()
         log(f"User:{self.id} has signed out.")
 
@@ -156,6 +158,10 @@ class User(BaseObject):
                 'table': 'Transactions',
                 'user_id': 'User_id'
             },
+            'CSVFiles': {
+                'table': 'CSVFiles',
+                'user_id': 'User_id'
+            },
             'Users': {
                 'table': 'Users',
                 'user_id': 'id'
@@ -182,12 +188,7 @@ class User(BaseObject):
         :raises NoDataFound: Exception that is raised when there is no earliest transaction data available for this user.
         :return: The date that has the first transaction made for the user.
         """
-        first_transaction = """
-                           SELECT MIN(Date)
-                           FROM Transactions
-                           WHERE User_id=?;
-                           """
-        transaction = self.db.fetchall(query=first_transaction, values=(self.id,))[0][0]
+        transaction = get_transaction_stats(self.id).earliest_date
 
         if transaction is not None:
             return transaction
@@ -200,12 +201,7 @@ class User(BaseObject):
         :raises NoDataFound: Exception that is raised when there is no latest transaction data available for this user.
         :return: The date that has the latest transaction made for the user.
         """
-        latest_transaction = """
-                           SELECT MAX(Date)
-                           FROM Transactions
-                           WHERE User_id=?;
-                           """
-        transaction = self.db.fetchall(latest_transaction, values=(self.id,))[0][0]
+        transaction = get_transaction_stats(self.id).latest_date
 
         if transaction is not None:
             return transaction
@@ -218,14 +214,9 @@ class User(BaseObject):
         :raises NoDataFound: Exception that is raised when there is no transaction data available for this user.
         :return: The total number of transactions this user has made.
         """
-        total_transactions = """
-                            SELECT COUNT(*)
-                            FROM Transactions
-                            WHERE User_id=?;
-                            """
-        total = self.db.fetchall(total_transactions, values=(self.id,))[0][0]
+        total = get_transaction_stats(self.id).count
 
-        if total is not None:
-            return int(total)
+        if total > 0:
+            return total
 
         raise NoDataFound
@@ -0,0 +1,144 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from objects.watchers.Watcher import Watcher
+
+# Flags found within <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK if hasattr(os, 'O_NONBLOCK') else 0
+IN_CLOEXEC = os.O_CLOEXEC if hasattr(os, 'O_CLOEXEC') else 0
+
+# The events each folder is watched for: files being written or moved in, and folders being removed or moved away.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+# Layout of the fixed-size portion of an inotify event: wd, mask, cookie, len.
+EVENT_HEADER = struct.Struct('iIII')
+
+
+def load_libc():
+    """
+    Load the C library if it provides the inotify functions.
+    :return: The C library, or None if inotify is not available.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, 'inotify_init1') else None
+
+
+def inotify_is_available() -> bool:
+    """
+    Determine if the inotify watcher can be used on this platform.
+    :return: True if inotify is available, False otherwise.
+    """
+    return load_libc() is not None
+
+
+class InotifyWatcher(Watcher):
+    """
+    This class will be used to watch folders with Linux's inotify, blocking without using any CPU until the kernel
+    reports a change.
+    """
+
+    def __init__(self, folders: list) -> None:
+        """
+        Construct an Inotify Watcher.
+        :param folders: The folders to watch.
+        :raises OSError: Exception raised when an inotify instance could not be created.
+        """
+        super(InotifyWatcher, self).__init__(folders)
+        self.libc = load_libc()
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "Unable to initialize inotify.")
+
+        # Pipe used to wake up wait() when the watcher is closed. The lock keeps close() from writing to the pipe
+        # while release() is closing it.
+        self.wake_read, self.wake_write = os.pipe()
+        self.lock = threading.Lock()
+        self.watches = {}
+        self.watch(self.folders)
+
+    def watch(self, folders: list) -> None:
+        """
+        Start watching every folder that exists. Adding a watch again is cheap, as the kernel returns the existing
+        watch of a folder; a new one is only created when the folder was replaced, e.g. after its parent was moved.
+        :param folders: The folders to watch.
+        """
+        for folder in folders:
+            if folder not in self.folders:
+                self.folders.append(folder)
+            if not os.path.isdir(folder):
+                continue
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+            if wd < 0:
+                continue
+            for stale_wd in [key for key, value in self.watches.items() if value == folder and key != wd]:
+                self.libc.inotify_rm_watch(self.fd, stale_wd)
+                del self.watches[stale_wd]
+            self.watches[wd] = folder
+
+    def wait(self) -> list:
+        """
+        Block until the kernel reports a change within one of the watched folders.
+        :return: A list containing the paths of every file that was added or written to.
+        """
+        readable = []
+        while not self.closed and self.fd not in readable:
+            readable, _, _ = select.select([self.fd, self.wake_read], [], [])
+        if self.closed:
+            return []
+
+        changes = []
+        buffer = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(buffer, offset)
+            name = buffer[offset + EVENT_HEADER.size: offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            folder = self.watches.get(wd)
+
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF) and folder is not None:
+                # The kernel drops the watch of a removed folder; it is added again once the folder is recreated.
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and not mask & IN_ISDIR and folder is not None:
+                changes.append(os.path.join(folder, os.fsdecode(name)))
+        return changes
+
+    def close(self) -> None:
+        """
+        Stop watching, waking up any thread blocked within wait(). The file descriptors are left open, as the waiting
+        thread may still be about to select() on them; they are closed by release().
+        """
+        with self.lock:
+            if self.closed:
+                return
+            super(InotifyWatcher, self).close()
+            os.write(self.wake_write, b'\0')
+
+    def release(self) -> None:
+        """
+        Stop watching and close the inotify instance and the wake-up pipe.
+        """
+        self.close()
+        with self.lock:
+            if self.fd < 0:
+                return
+            os.close(self.fd)
+            os.close(self.wake_read)
+            os.close(self.wake_write)
+            self.fd = -1
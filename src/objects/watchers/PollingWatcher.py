@@ -0,0 +1,75 @@
+import os
+import threading
+from objects.watchers.Watcher import Watcher
+
+
+class PollingWatcher(Watcher):
+    """
+    This class will be used to watch folders by comparing their contents every interval.
+    Used on platforms where inotify is not available.
+    """
+
+    def __init__(self, folders: list, interval: float) -> None:
+        """
+        Construct a Polling Watcher.
+        :param folders: The folders to watch.
+        :param interval: The number of seconds to wait between each scan of the folders.
+        """
+        super(PollingWatcher, self).__init__(folders)
+        self.interval = interval
+        self.closed_event = threading.Event()
+        self.snapshot = self.take_snapshot()
+
+        # The size and modification time each file had when it was last reported, or when watching started.
+        self.reported = dict(self.snapshot)
+
+    def take_snapshot(self) -> dict:
+        """
+        Record the size and modification time of every file within the watched folders.
+        :return: A dictionary containing the paths of the files as the keys, and their (size, mtime) as the value.
+        """
+        snapshot = {}
+        for folder in self.folders:
+            if not os.path.isdir(folder):
+                continue
+            for entry in os.scandir(folder):
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.path] = (stat.st_size, stat.st_mtime)
+        return snapshot
+
+    def watch(self, folders: list) -> None:
+        """
+        Start watching a list of folders.
+        :param folders: The folders to watch.
+        """
+        for folder in folders:
+            if folder not in self.folders:
+                self.folders.append(folder)
+
+    def wait(self) -> list:
+        """
+        Sleep for one interval, then report the files that were added or written to.
+        A file is only reported once its size and modification time are the same for two consecutive scans, so that
+        files still being copied are not reported half-written.
+        Returning after every interval lets the caller check on its folders at the same rate.
+        :return: A list containing the paths of every file that was added or written to.
+        """
+        self.closed_event.wait(self.interval)
+        if self.closed:
+            return []
+
+        snapshot = self.take_snapshot()
+        changes = [path for path, info in snapshot.items()
+                   if self.snapshot.get(path) == info and self.reported.get(path) != info]
+        self.reported = {path: info for path, info in self.reported.items() if path in snapshot}
+        self.reported.update((path, snapshot[path]) for path in changes)
+        self.snapshot = snapshot
+        return changes
+
+    def close(self) -> None:
+        """
+        Stop watching, waking up any thread blocked within wait().
+        """
+        super(PollingWatcher, self).close()
+        self.closed_event.set()
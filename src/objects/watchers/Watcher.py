@@ -0,0 +1,39 @@
+class Watcher:
+    """
+    Abstract class that will be used to construct a watcher, which blocks until the contents of a set of folders change.
+    """
+
+    def __init__(self, folders: list) -> None:
+        """
+        Construct a Watcher.
+        :param folders: The folders to watch.
+        """
+        self.folders = list(folders)
+        self.closed = False
+
+    def watch(self, folders: list) -> None:
+        """
+        Start (or resume) watching a list of folders, such as after they have been recreated.
+        :param folders: The folders to watch.
+        """
+        pass
+
+    def wait(self) -> list:
+        """
+        Block until a change is detected or the watcher is closed.
+        :return: A list containing the paths of every file that was added or written to.
+        """
+        pass
+
+    def close(self) -> None:
+        """
+        Stop watching, waking up any thread blocked within wait().
+        """
+        self.closed = True
+
+    def release(self) -> None:
+        """
+        Stop watching and free the resources held by the watcher. Only called by the thread that waits on the watcher,
+        once it no longer does, as wait() cannot be using them at that point.
+        """
+        self.close()
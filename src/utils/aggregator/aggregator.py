@@ -0,0 +1,94 @@
+from utils.cache.cache import get_transaction_cache
+from objects.interface.dbconn import DB, query_registry
+from utils import globals as _globals
+from utils.dates.dates import is_last_day_of_month
+from utils.enums import Buckets
+from utils.formatting.formatter import format_date_to_day_number
+
+# The earliest and latest dates used when aggregating over all time.
+ALL_TIME = ("0001-01-01", "9999-12-31")
+
+# Dictionary to contain the Enum of a bucket as a Key, and the number of characters of a YYYY-MM-DD date
+# that identify the bucket as the value.
+BUCKET_LENGTHS = {
+    Buckets.DAY.name: 10,
+    Buckets.MONTH.name: 7,
+    Buckets.YEAR.name: 4,
+}
+
+
+def covers_whole_months(dates: tuple) -> bool:
+    """
+    Determine if a date range starts on the first day of a month and ends on the last day of a month.
+    :param dates: The tuple containing the starting and ending dates.
+    :return: True if the range only contains whole months, false otherwise.
+    """
+    return dates[0].endswith("-01") and is_last_day_of_month(dates[1])
+
+
+def covers_whole_years(dates: tuple) -> bool:
+    """
+    Determine if a date range starts on January 1st and ends on December 31st.
+    :param dates: The tuple containing the starting and ending dates.
+    :return: True if the range only contains whole years, false otherwise.
+    """
+    return dates[0].endswith("-01-01") and dates[1].endswith("-12-31")
+
+
+def get_aggregate_query(bucket: Buckets, dates: tuple = ALL_TIME) -> (str, tuple):
+    """
+    Build the query used to total a user's transactions per bucket between two dates, and register it within the
+    query registry. Day, month and year buckets are answered from the smallest spending rollup that exactly covers the
+    date range, while merchant buckets are answered from the 'Transactions' table by day number.
+    :param bucket: The bucket to group the transactions by.
+    :param dates: The tuple containing the starting and ending dates. Note: dates[0] - start_date, dates[1] - end_date.
+    :return: The name of the query within the query registry, and the bounds to bind after the user's id.
+    """
+    if bucket.name == Buckets.MERCHANT.name:
+        bounds = (format_date_to_day_number(dates[0]), format_date_to_day_number(dates[1]))
+        return query_registry.register("AGGREGATE_MERCHANT_Transactions",
+                                       """SELECT Merchant, SUM(Amount_Cents)
+                                          FROM Transactions
+                                          WHERE User_id=? AND Day_Number BETWEEN ? AND ?
+                                          GROUP BY Merchant
+                                          ORDER BY Merchant;"""), bounds
+
+    length = BUCKET_LENGTHS[bucket.name]
+    if bucket.name == Buckets.YEAR.name and covers_whole_years(dates):
+        table, key, key_length = _globals.SPENDING_ROLLUPS[2]
+    elif bucket.name != Buckets.DAY.name and covers_whole_months(dates):
+        table, key, key_length = _globals.SPENDING_ROLLUPS[1]
+    else:
+        table, key, key_length = _globals.SPENDING_ROLLUPS[0]
+
+    # Group by the key itself when the bucket matches the rollup, so the primary key can be used for the grouping.
+    expression = key if length == key_length else f"substr({key}, 1, {length})"
+    bounds = (dates[0][:key_length], dates[1][:key_length])
+
+    return query_registry.register(f"AGGREGATE_{bucket.name}_{table}",
+                                   f"""SELECT {expression}, SUM(Total_Cents)
+                                       FROM {table}
+                                       WHERE User_id=? AND {key} BETWEEN ? AND ?
+                                       GROUP BY {expression}
+                                       ORDER BY {expression};"""), bounds
+
+
+def aggregate(user_id: int, bucket: Buckets, dates: tuple = ALL_TIME) -> dict:
+    """
+    Total a user's transactions per bucket, from the user's transaction cache or with a single query.
+    :param user_id: The id of the current user.
+    :param bucket: The bucket to group the transactions by (day, month, year, or merchant).
+    :param dates: The tuple containing the starting and ending dates. Note: dates[0] - start_date, dates[1] - end_date.
+    :return: A dictionary containing the totals in cents, ordered by bucket.
+             The dictionary is set up as: {bucket : total_cents}
+             Note: days are keyed as YYYY-MM-DD, months as YYYY-MM, and years as YYYY.
+    """
+    cache = get_transaction_cache(user_id)
+    if cache is not None:
+        return cache.get_totals(bucket, dates)
+
+    name, bounds = get_aggregate_query(bucket, dates)
+    db = DB(_globals.DATABASE)
+    rows = db.fetch_named(name, values=(user_id,) + tuple(bounds))
+    db.close()
+    return {key: total for key, total in rows if total is not None}
@@ -0,0 +1,81 @@
+"""
+Rebuild or verify the spending rollup tables (DailySpend, MonthlySpend, YearlySpend).
+
+Run from the 'src' directory:
+    python3 -m utils.aggregator.rollups --verify
+    python3 -m utils.aggregator.rollups --rebuild [--user USER_ID]
+"""
+from argparse import ArgumentParser
+from objects.interface.dbconn import DB
+import utils.globals as _globals
+from utils.logger.logger import log
+from utils.print import print_message, print_error
+
+# Query used to compute a rollup directly from the 'Transactions' table. Transactions without a day number are left
+# out, as they are by the rollup triggers.
+COMPUTE_ROLLUP = '''SELECT User_id, substr(Date, 1, {length}), SUM(IFNULL(Amount_Cents, 0)), COUNT(*)
+                    FROM Transactions
+                    WHERE Day_Number IS NOT NULL {condition}
+                    GROUP BY User_id, substr(Date, 1, {length})'''
+
+
+def rebuild_rollups(db: DB, user_id: int = None) -> None:
+    """
+    Recompute the spending rollups from the 'Transactions' table within a single transaction.
+    :param db: The database connection.
+    :param user_id: The id of the user to rebuild the rollups for. Every user is rebuilt if not specified.
+    """
+    where = "WHERE User_id=?" if user_id is not None else ""
+    condition = "AND User_id=?" if user_id is not None else ""
+    values = (user_id,) if user_id is not None else None
+
+    with db.transaction():
+        for table, key, length in _globals.SPENDING_ROLLUPS:
+            db.commit(f"DELETE FROM {table} {where};", values=values)
+            db.commit(f"INSERT INTO {table}(User_id, {key}, Total_Cents, Count) "
+                      f"{COMPUTE_ROLLUP.format(length=length, condition=condition)};", values=values)
+
+    log(f"The spending rollups have been rebuilt for {f'User:{user_id}' if user_id is not None else 'every user'}.",
+        level="info")
+
+
+def verify_rollups(db: DB) -> dict:
+    """
+    Compare the spending rollups against the totals computed directly from the 'Transactions' table.
+    :param db: The database connection.
+    :return: A dictionary containing each rollup table as the key, and the number of rows that differ as the value.
+    """
+    mismatches = {}
+    for table, key, length in _globals.SPENDING_ROLLUPS:
+        expected = COMPUTE_ROLLUP.format(length=length, condition="")
+        actual = f"SELECT User_id, {key}, Total_Cents, Count FROM {table}"
+        mismatches[table] = db.fetchall(f"SELECT COUNT(*) FROM ({expected} EXCEPT {actual});")[0][0] \
+            + db.fetchall(f"SELECT COUNT(*) FROM ({actual} EXCEPT {expected});")[0][0]
+    return mismatches
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--rebuild', help='recompute the rollups from the transactions.', action='store_true')
+    parser.add_argument('--verify', help='compare the rollups against the transactions.', action='store_true')
+    parser.add_argument('--user', type=int, help='the id of the user to rebuild the rollups for.')
+    args = parser.parse_args()
+
+    db = DB(_globals.DATABASE)
+    if args.rebuild:
+        rebuild_rollups(db, args.user)
+        print_message("The spending rollups have been rebuilt.")
+
+    if args.verify or not args.rebuild:
+        mismatches = verify_rollups(db)
+        for table in mismatches:
+            print_message(f"{table}:\t{mismatches[table]} mismatched rows")
+        if any(mismatches.values()):
+            print_error("The spending rollups are out of date. Run with --rebuild to recompute them.")
+            db.close()
+            exit(1)
+    db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,8 @@
+from utils.cache.cache import get_transaction_cache
 from objects.interface.dbconn import DB
 from utils import globals as _globals
 from utils.exceptions import NoDataFound
+from utils.formatting.formatter import format_cents_to_amount
 
 
 def calculate_average(start_date: str, end_date: str, user_id: int, exception_type: str = "average") -> float:
@@ -13,19 +15,15 @@ def calculate_average(start_date: str, end_date: str, user_id: int, exception_ty
     :raises NoDataFound: Exception raised when there was no data to be found when calculating the average.
     :return: The average total spent in transactions between start_date and end_date.
     """
-    db = DB(_globals.DATABASE)
-
-    query = f"""
-            SELECT AVG(Amount)
-            FROM TRANSACTIONS
-            WHERE Date BETWEEN DATE('{start_date}') AND DATE('{end_date}') AND User_id=?;
-            """
-
-    average = db.fetchall(query, values=(user_id,))[0][0]
-
-    db.close()
+    cache = get_transaction_cache(user_id)
+    if cache is not None:
+        average = cache.get_average((start_date, end_date))
+    else:
+        db = DB(_globals.DATABASE)
+        average = db.fetch_named("SELECT_AVERAGE_BETWEEN_DATES", values=(user_id, start_date, end_date))[0][0]
+        db.close()
 
     if average is not None:
-        return round(float(average), 2)
+        return format_cents_to_amount(average)
 
     raise NoDataFound(exception_type)
@@ -0,0 +1,131 @@
+"""
+Benchmark the per-row ingestion path against the bulk ingestion path, and the bulk path with parallel parsing.
+
+Run from the 'src' directory:
+    python3 -m utils.benchmarks.ingest_benchmark --rows 5000 --files 12 --workers 4
+"""
+import csv
+import os
+import random
+import tempfile
+import time
+from functools import partial
+from argparse import ArgumentParser
+from objects.accounts.Apple import AppleReceipt
+from objects.accounts.ESL import ESLReceipt
+from objects.interface.dbconn import DB, connection_manager
+from utils.importers.importers import APPLE_HEADER_ROWS, ESL_HEADER_ROWS
+from utils.ingest.ingest import ingest_files
+from utils.print import print_message
+
+MERCHANTS = ["Walmart", "Amazon.com", "Exxon Mobil", "Apple", "CVS Health", "Target", "Costco", "Wegmans"]
+
+
+def write_esl_export(path: str, rows: int) -> None:
+    """
+    Write a synthetic ESL export.
+    :param path: The file to write.
+    :param rows: The number of receipts to write.
+    """
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["Account Name : Benchmark"])
+        writer.writerow(["Account Number : 0"])
+        writer.writerow(["Date Range : Benchmark"])
+        writer.writerow(["Transaction Number", "Date", "Description", "Memo", "Amount Debit", "Amount Credit",
+                         "Balance", "Check Number", "Fees"])
+        for i in range(rows):
+            date = f"{random.randint(1, 12):02d}/{random.randint(1, 28):02d}/{random.randint(2015, 2021)}"
+            writer.writerow([f"{i}", date, "Benchmark", random.choice(MERCHANTS),
+                             f"{-random.uniform(0, 250):.2f}", "", f"{random.uniform(0, 5000):.2f}", "", ""])
+
+
+def write_apple_export(path: str, rows: int) -> None:
+    """
+    Write a synthetic Apple Card export.
+    :param path: The file to write.
+    :param rows: The number of receipts to write.
+    """
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["Transaction", "Clearing Date", "Description", "Merchant", "Category", "Type",
+                         "Amount (USD)"])
+        for i in range(rows):
+            date = f"{random.randint(1, 12):02d}/{random.randint(1, 28):02d}/{random.randint(2015, 2021)}"
+            writer.writerow([date, date, f"Benchmark {i}", random.choice(MERCHANTS), "Shopping", "Purchase",
+                             f"{random.uniform(0, 250):.2f}"])
+
+
+def per_row_insert_files(db: DB, files: list, user_id: int) -> bool:
+    """
+    The original ingestion path: one existence probe and one commit per receipt.
+    :param db: The database connection.
+    :param files: The list of csv files to insert.
+    :param user_id: The id of the user to insert the files for.
+    :return: True if any data was inserted.
+    """
+    db_updated = False
+    for file in files:
+        with open(file, newline='') as csv_file:
+            rows = list(csv.reader(csv_file))
+
+        header_rows = APPLE_HEADER_ROWS if "Apple" in file else ESL_HEADER_ROWS
+        for row in rows[header_rows:]:
+            receipt = AppleReceipt(db, row, user_id) if "Apple" in file else ESLReceipt(db, row, user_id)
+            if not receipt.exists_in_db():
+                receipt.insert_to_db()
+                db_updated = True
+    return db_updated
+
+
+def time_ingestion(insert, files: list, rows: int) -> float:
+    """
+    Time an ingestion function against a fresh database.
+    :param insert: The ingestion function to time.
+    :param files: The files to ingest.
+    :param rows: The total number of rows within the files.
+    :return: The number of rows ingested per second.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db_file = os.path.join(directory, "benchmark.db")
+        db = DB(db_file)
+        db.setup_tables()
+        db.setup_indexes()
+        db.setup_triggers()
+        start = time.perf_counter()
+        insert(db, files, 1)
+        elapsed = time.perf_counter() - start
+        connection_manager.close_connection(db_file)
+    return rows / elapsed
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000, help='the number of rows to write per account export.')
+    parser.add_argument('--seed', type=int, default=0, help='the seed used to generate the exports.')
+    parser.add_argument('--files', type=int, default=1, help='the number of exports to write per account.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help='the number of processes used by the parallel ingestion path.')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = []
+        for i in range(args.files):
+            files.append(os.path.join(directory, f"ESL-export-{i}.csv"))
+            files.append(os.path.join(directory, f"Apple-export-{i}.csv"))
+            write_esl_export(files[-2], args.rows)
+            write_apple_export(files[-1], args.rows)
+        total_rows = 2 * args.files * args.rows
+
+        before = time_ingestion(per_row_insert_files, files, total_rows)
+        after = time_ingestion(partial(ingest_files, workers=1), files, total_rows)
+        parallel = time_ingestion(partial(ingest_files, workers=args.workers), files, total_rows)
+
+    print_message(f"per-row ingestion:\t{before:,.0f} rows/sec")
+    print_message(f"bulk ingestion:\t\t{after:,.0f} rows/sec ({after / before:,.1f}x)")
+    print_message(f"parallel ingestion:\t{parallel:,.0f} rows/sec ({parallel / before:,.1f}x, {args.workers} workers)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark the memory held per parsed row by receipt objects and by the insert rows built for ingestion.
+
+Run from the 'src' directory:
+    python3 -m utils.benchmarks.memory_benchmark --rows 1000000
+"""
+import gc
+import os
+import random
+import tempfile
+import tracemalloc
+from argparse import ArgumentParser
+from objects.accounts.Apple import AppleReceipt, build_apple_rows
+from objects.accounts.ESL import ESLReceipt, build_esl_rows
+from utils.benchmarks.ingest_benchmark import write_apple_export, write_esl_export
+from utils.importers.importers import APPLE_HEADER_ROWS, ESL_HEADER_ROWS
+from utils.print import print_message
+from utils.streaming.streaming import read_rows, skip_rows
+
+
+def bytes_per_row(parse, file: str, header_rows: int, rows: int) -> float:
+    """
+    Measure the memory held by the records parsed from a file, once the csv rows themselves have been released.
+    :param parse: The function parsing the rows of the file into records.
+    :param file: The csv file to parse.
+    :param header_rows: The number of rows found at the top of the file before the first receipt.
+    :param rows: The number of receipts within the file.
+    :return: The number of bytes held per row.
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = parse(skip_rows(read_rows(file), header_rows))
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return held / rows
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000, help='the number of rows to write per account export.')
+    parser.add_argument('--seed', type=int, default=0, help='the seed used to generate the exports.')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    exports = (
+        ("Apple", write_apple_export, AppleReceipt, build_apple_rows, APPLE_HEADER_ROWS),
+        ("ESL", write_esl_export, ESLReceipt, build_esl_rows, ESL_HEADER_ROWS),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name, write_export, receipt_type, build_rows, header_rows in exports:
+            file = os.path.join(directory, f"{name}-export.csv")
+            write_export(file, args.rows)
+
+            objects = bytes_per_row(lambda rows: [receipt_type(None, row, 1) for row in rows],
+                                    file, header_rows, args.rows)
+            tuples = bytes_per_row(lambda rows: build_rows(list(rows), 1), file, header_rows, args.rows)
+            print_message(f"{name} receipt objects:\t{objects:,.0f} bytes/row")
+            print_message(f"{name} insert rows:\t{tuples:,.0f} bytes/row")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Benchmark the database tuning profiles: per-row commits, bulk ingestion and report latency under each profile,
+against sqlite's own defaults.
+
+Run from the 'src' directory:
+    python3 -m utils.benchmarks.profile_benchmark --rows 20000 --queries 300
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from argparse import ArgumentParser
+from objects.interface.dbconn import DB, connection_manager
+import utils.globals as _globals
+from utils.aggregator.aggregator import aggregate
+from utils.averager.averager import calculate_average
+from utils.benchmarks.ingest_benchmark import per_row_insert_files, write_apple_export, write_esl_export
+from utils.enums import Buckets
+from utils.ingest.ingest import ingest_files
+from utils.print import print_message
+
+# The settings sqlite uses when no pragmas are applied, registered as a profile so that it can be compared.
+SQLITE_DEFAULTS = "sqlite-defaults"
+SQLITE_DEFAULT_PRAGMAS = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -2000,
+    "mmap_size": 0,
+    "temp_store": "DEFAULT"
+}
+
+
+def create_database(directory: str, name: str, profile: str) -> DB:
+    """
+    Create an empty database using a tuning profile.
+    :param directory: The directory to create the database in.
+    :param name: The name of the database file.
+    :param profile: The name of the profile.
+    :return: The database connection.
+    """
+    connection_manager.set_profile(profile)
+    db = DB(os.path.join(directory, f"{name}.db"))
+    db.setup_tables()
+    db.setup_indexes()
+    db.setup_triggers()
+    return db
+
+
+def time_report_queries(user_id: int, queries: int) -> list:
+    """
+    Time report queries over random date ranges, answered by the database rather than the transaction cache.
+    :param user_id: The id of the user to report on.
+    :param queries: The number of queries to time.
+    :return: The latency of each query, in milliseconds.
+    """
+    latencies = []
+    for _ in range(queries):
+        year = random.randint(2015, 2021)
+        dates = (f"{year}-{random.randint(1, 6):02d}-01", f"{year}-{random.randint(7, 12):02d}-28")
+        start = time.perf_counter()
+        aggregate(user_id, random.choice([Buckets.DAY, Buckets.MONTH, Buckets.MERCHANT]), dates)
+        calculate_average(dates[0], dates[1], user_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def benchmark_profile(directory: str, profile: str, per_row_files: list, bulk_files: list, per_row_count: int,
+                      bulk_count: int, queries: int) -> dict:
+    """
+    Run every benchmark under a single profile.
+    :param directory: The directory to create the databases in.
+    :param profile: The name of the profile.
+    :param per_row_files: The exports inserted one commit per receipt.
+    :param bulk_files: The exports inserted through the bulk ingestion path.
+    :param per_row_count: The number of receipts within per_row_files.
+    :param bulk_count: The number of receipts within bulk_files.
+    :param queries: The number of report queries to time.
+    :return: A dictionary containing the per-row and bulk rows per second, and the median and 95th percentile
+             report latencies.
+    """
+    # Ingest under the benchmarked profile rather than switching to the ingest profile.
+    _globals.INGEST_DATABASE_PROFILE = profile
+
+    db = create_database(directory, f"{profile}-per-row", profile)
+    start = time.perf_counter()
+    per_row_insert_files(db, per_row_files, 1)
+    per_row = per_row_count / (time.perf_counter() - start)
+
+    db = create_database(directory, f"{profile}-bulk", profile)
+    start = time.perf_counter()
+    ingest_files(db, bulk_files, 1)
+    bulk = bulk_count / (time.perf_counter() - start)
+
+    # The reports query the database the global path points to.
+    _globals.DATABASE = os.path.join(directory, f"{profile}-bulk.db")
+    latencies = sorted(time_report_queries(1, queries))
+    connection_manager.close_all()
+    return {
+        'per_row': per_row,
+        'bulk': bulk,
+        'median': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1]
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20000, help='the number of rows to write per account export.')
+    parser.add_argument('--per_row', type=int, default=500,
+                        help='the number of rows per export inserted one commit at a time.')
+    parser.add_argument('--queries', type=int, default=300, help='the number of report queries to time.')
+    parser.add_argument('--seed', type=int, default=0, help='the seed used to generate the exports.')
+    parser.add_argument('--directory', default=None,
+                        help='the directory to create the databases in. Use a directory on the disk being tuned, '
+                             'since a memory-backed directory hides the cost of syncing.')
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # Report queries are timed against the database, not the in-memory copy of the transactions.
+    _globals.USE_TRANSACTION_CACHE = False
+    _globals.DATABASE_PROFILES[SQLITE_DEFAULTS] = SQLITE_DEFAULT_PRAGMAS
+
+    results = {}
+    with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+        per_row_files = [os.path.join(directory, "Apple-per-row.csv"), os.path.join(directory, "ESL-per-row.csv")]
+        bulk_files = [os.path.join(directory, "Apple-bulk.csv"), os.path.join(directory, "ESL-bulk.csv")]
+        write_apple_export(per_row_files[0], args.per_row)
+        write_esl_export(per_row_files[1], args.per_row)
+        write_apple_export(bulk_files[0], args.rows)
+        write_esl_export(bulk_files[1], args.rows)
+
+        for profile in [SQLITE_DEFAULTS] + [name for name in _globals.DATABASE_PROFILES if name != SQLITE_DEFAULTS]:
+            random.seed(args.seed)
+            results[profile] = benchmark_profile(directory, profile, per_row_files, bulk_files, 2 * args.per_row,
+                                                 2 * args.rows, args.queries)
+
+    print_message(f"{'profile':<16}{'per-row rows/sec':>18}{'bulk rows/sec':>16}{'report p50':>13}{'report p95':>13}")
+    for profile, result in results.items():
+        print_message(f"{profile:<16}{result['per_row']:>18,.0f}{result['bulk']:>16,.0f}"
+                      f"{result['median']:>10.2f} ms{result['p95']:>10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
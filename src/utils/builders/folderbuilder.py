@@ -1,41 +1,23 @@
 import os
-import csv
-from objects.accounts.Apple import AppleReceipt
-from objects.accounts.ESL import ESLReceipt
 from objects.interface.dbconn import DB
 from objects.user.User import User
 import utils.globals as _globals
 from utils.exceptions import UserNotFound
+from utils.ingest.ingest import ingest_files
 from utils.logger.logger import log
 
 
-def insert_files(db: DB, files: list, user_id: int,) -> bool:
+def insert_files(db: DB, files: list, user_id: int, single_transaction: bool = False, workers: int = None) -> bool:
     """
     Insert files into the database.
     :param db: The connection to the database.
     :param files: The list of files to insert.
     :param user_id: The id of the current user.
+    :param single_transaction: Boolean to determine whether to commit the whole upload at once rather than per file.
+    :param workers: The number of worker processes used to parse the files. Defaults to INGEST_WORKERS.
     :return: True if file insertion was successful. False otherwise.
     """
-    db_updated = False
-    for file in files:
-
-        with open(file, newline='') as csv_file:
-            rows = list(csv.reader(csv_file))
-
-            row = 1 if "Apple" in file else 4
-
-            for i in range(row, len(rows)):
-                receipt = None
-
-                if "Apple" in file:
-                    receipt = AppleReceipt(db, rows[i], user_id)
-                elif "ESL" in file:
-                    receipt = ESLReceipt(db, rows[i], user_id)
-
-                if receipt is not None and not receipt.exists_in_db():
-                    receipt.insert_to_db()
-                    db_updated = True
+    db_updated = ingest_files(db, files, user_id, single_transaction=single_transaction, workers=workers)
 
     if db_updated:
         log("The database has been updated.", level="debug")
@@ -0,0 +1,110 @@
+import threading
+from objects.cache.TransactionStats import TransactionStats
+from objects.interface.dbconn import DB, query_registry
+import utils.globals as _globals
+from utils.logger.logger import log
+
+# Command used to load every transaction of a user, ordered by day. Answered from the day index alone.
+# Transactions whose date could not be read have no day number, and cannot be placed within a date range.
+SELECT_CACHED_TRANSACTIONS = '''SELECT Day_Number, IFNULL(Amount_Cents, 0), Card_Type, Merchant
+                                FROM Transactions
+                                WHERE User_id=? AND Day_Number IS NOT NULL
+                                ORDER BY Day_Number;'''
+query_registry.register("SELECT_CACHED_TRANSACTIONS", SELECT_CACHED_TRANSACTIONS)
+
+# The loaded caches and stats, keyed by user id.
+_caches = {}
+_stats = {}
+_caches_lock = threading.Lock()
+
+# Incremented on every invalidation, so that a cache loaded while its transactions were changing is not kept.
+_generation = 0
+
+
+def load_transaction_cache(user_id: int):
+    """
+    Load a user's transactions into their cache, replacing any previous copy.
+    :param user_id: The id of the user.
+    :return: The user's cache.
+    """
+    # Imported here so that numpy is only loaded once a cache is needed, rather than when the application starts.
+    from objects.cache.TransactionCache import TransactionCache
+
+    with _caches_lock:
+        generation = _generation
+
+    db = DB(_globals.DATABASE)
+    rows = db.fetch_named("SELECT_CACHED_TRANSACTIONS", values=(user_id,))
+    db.close()
+
+    cache = TransactionCache(user_id, rows)
+    with _caches_lock:
+        if generation == _generation:
+            _caches[user_id] = cache
+    log(f"User:{user_id} has {len(cache)} cached transactions.", level="debug")
+    return cache
+
+
+def get_transaction_cache(user_id: int):
+    """
+    Retrieve a user's cache, loading it if it was invalidated or has not been loaded yet.
+    :param user_id: The id of the user.
+    :return: The user's cache, or None if the cache is disabled.
+    """
+    if not _globals.USE_TRANSACTION_CACHE:
+        return None
+    with _caches_lock:
+        cache = _caches.get(user_id)
+    return cache if cache is not None else load_transaction_cache(user_id)
+
+
+def load_transaction_stats(user_id: int) -> TransactionStats:
+    """
+    Load the summary of a user's transactions, replacing any previous copy. The dates are read from the ends of the
+    day index, and the years and count from the yearly spending rollup, so no transactions are scanned.
+    :param user_id: The id of the user.
+    :return: The user's stats.
+    """
+    with _caches_lock:
+        generation = _generation
+
+    db = DB(_globals.DATABASE)
+    earliest_date = db.fetch_named("SELECT_EARLIEST_DATE", values=(user_id,))[0][0]
+    latest_date = db.fetch_named("SELECT_LATEST_DATE", values=(user_id,))[0][0]
+    year_counts = db.fetch_named("SELECT_YEAR_COUNTS", values=(user_id,))
+    db.close()
+
+    stats = TransactionStats(user_id, (earliest_date, latest_date), year_counts)
+    with _caches_lock:
+        if generation == _generation and _globals.USE_TRANSACTION_CACHE:
+            _stats[user_id] = stats
+    return stats
+
+
+def get_transaction_stats(user_id: int) -> TransactionStats:
+    """
+    Retrieve the summary of a user's transactions, loading it if it was invalidated or has not been loaded yet.
+    The stats are read from the database every time when the cache is disabled.
+    :param user_id: The id of the user.
+    :return: The user's stats.
+    """
+    with _caches_lock:
+        stats = _stats.get(user_id)
+    return stats if stats is not None else load_transaction_stats(user_id)
+
+
+def invalidate_transaction_cache(user_id: int = None) -> None:
+    """
+    Discard a user's cache and stats after their transactions have changed. They are reloaded the next time they
+    are needed.
+    :param user_id: The id of the user, or None to discard every cache.
+    """
+    global _generation
+    with _caches_lock:
+        _generation += 1
+        if user_id is None:
+            _caches.clear()
+            _stats.clear()
+        else:
+            _caches.pop(user_id, None)
+            _stats.pop(user_id, None)
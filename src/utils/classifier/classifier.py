@@ -0,0 +1,118 @@
+import json
+import re
+from itertools import compress
+import utils.globals as _globals
+from utils.exceptions import InvalidPaymentRule
+
+# The compiled rules of each account, loaded once per process.
+_payment_rules = {}
+
+
+class PaymentRules:
+    """
+    The payment classification rules of an account, compiled into set lookups and a single combined regex per column.
+    Rules are loaded from PAYMENT_RULES, and support three kinds of tests on a column of the account's exports:
+        - "equals":   the value is one of the listed strings.
+        - "contains": the value contains one of the listed strings.
+        - "matches":  the value matches one of the listed regular expressions.
+    A receipt is a payment if any of its account's rules match.
+    """
+
+    def __init__(self, account: str, columns: tuple, rules: dict) -> None:
+        """
+        Compile the rules of an account.
+        :param account: The name of the account the rules belong to.
+        :param columns: The names of the columns found within the account's exports, in order.
+        :param rules: The rules of the account, as found within the rules file.
+        :raises InvalidPaymentRule: Exception raised when a rule refers to a column the account does not have.
+        """
+        self.account = account
+        self.equals = {}
+        self.patterns = {}
+
+        for kind, values in rules.items():
+            for column, tests in values.items():
+                if column not in columns:
+                    raise InvalidPaymentRule(account, column)
+                index = columns.index(column)
+
+                if kind == "equals":
+                    self.equals[index] = self.equals.get(index, frozenset()) | frozenset(tests)
+                elif kind == "contains":
+                    self.patterns.setdefault(index, []).extend(re.escape(test) for test in tests)
+                elif kind == "matches":
+                    self.patterns.setdefault(index, []).extend(f"(?:{test})" for test in tests)
+
+        # The patterns of each column are combined into a single regular expression.
+        self.searches = tuple((index, re.compile("|".join(patterns)).search)
+                              for index, patterns in self.patterns.items())
+
+    def is_payment(self, row: list) -> bool:
+        """
+        Determine if a single csv row is a payment.
+        :param row: The csv row of the receipt.
+        :return: True if the receipt is a payment, False otherwise.
+        """
+        for index, values in self.equals.items():
+            if row[index] in values:
+                return True
+        for index, search in self.searches:
+            if search(row[index]):
+                return True
+        return False
+
+    @staticmethod
+    def _mark(payments: list, matches: list) -> list:
+        """
+        Mark the rows matched by a test as payments.
+        :param payments: The payments found by the previous tests, or None if no test has been applied yet.
+        :param matches: A list containing True for every row matched by the test.
+        :return: The payments found by all tests so far.
+        """
+        if payments is None:
+            return matches
+        for position in compress(range(len(matches)), matches):
+            payments[position] = True
+        return payments
+
+    def classify(self, rows: list) -> list:
+        """
+        Determine which csv rows of a batch are payments.
+        :param rows: The csv rows of the receipts.
+        :return: A list containing True for every row that is a payment, and False otherwise.
+        """
+        # Each test is applied to a whole column at once. The rows a test matches are then marked as payments, so
+        # that the rows are only visited in Python when they match.
+        payments = None
+        for index, values in self.equals.items():
+            payments = self._mark(payments, [row[index] in values for row in rows])
+        for index, search in self.searches:
+            payments = self._mark(payments, [search(row[index]) is not None for row in rows])
+        if payments is None:
+            return [False] * len(rows)
+        return payments
+
+
+def load_payment_rules(account: str, columns: tuple, file: str = None) -> PaymentRules:
+    """
+    Load and compile the payment rules of an account.
+    :param account: The name of the account, as found within the rules file.
+    :param columns: The names of the columns found within the account's exports, in order.
+    :param file: The rules file to read. Defaults to PAYMENT_RULES.
+    :return: The compiled rules of the account. Accounts without rules never contain payments.
+    """
+    with open(file or _globals.PAYMENT_RULES, encoding='utf-8') as rules_file:
+        rules = json.load(rules_file)
+    return PaymentRules(account, columns, rules.get(account, {}))
+
+
+def get_payment_rules(account: str, columns: tuple) -> PaymentRules:
+    """
+    Retrieve the compiled payment rules of an account, loading them the first time they are needed.
+    :param account: The name of the account, as found within the rules file.
+    :param columns: The names of the columns found within the account's exports, in order.
+    :return: The compiled rules of the account.
+    """
+    if account not in _payment_rules:
+        _payment_rules[account] = load_payment_rules(account, columns)
+    return _payment_rules[account]
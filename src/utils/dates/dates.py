@@ -1,9 +1,11 @@
+import calendar
 from datetime import datetime, timedelta
+from utils.cache.cache import get_transaction_cache, get_transaction_stats
 from objects.interface.dbconn import DB
 from utils import globals as _globals
 from utils.enums import Months
 from utils.exceptions import NoTotalBetweenDates
-from utils.formatting.formatter import format_date_pretty
+from utils.formatting.formatter import format_date_pretty, format_cents_to_amount
 
 
 def subtract_days(starting_date: str, days: int) -> str:
@@ -31,6 +33,16 @@ def is_leap_year(year: str) -> bool:
     return False
 
 
+def is_last_day_of_month(date: str) -> bool:
+    """
+    Determine if a date is the last day of its month.
+    :param date: The date to check, in YYYY-MM-DD format.
+    :return: True if the date is the last day of the month, false otherwise.
+    """
+    year, month, day = (int(part) for part in date.split("-"))
+    return calendar.monthrange(year, month)[1] == day
+
+
 def get_starting_dates() -> dict:
     """
     Retrieve a dictionary of months with their starting dates.
@@ -99,32 +111,38 @@ def get_all_years(user_id: int) -> list:
     :param user_id: The id of the user.
     :return: A list of tuples that contain every year that contains transactional data.
     """
-    db = DB(_globals.DATABASE)
-    years = db.fetchall(f"SELECT DISTINCT strftime('%Y', Date) "
-                        f"FROM Transactions "
-                        f"WHERE User_id=?;", values=(user_id,))
-    db.close()
-    years.sort()  # sort the tuples containing the years in ascending value.
-    return years
+    # The stats hold the years in ascending order.
+    return [(year,) for year in get_transaction_stats(user_id).years]
 
 
-def get_total_between_dates(dates: tuple, user_id: int) -> float:
+def get_cents_between_dates(dates: tuple, user_id: int) -> int:
     """
-    Get the total money spent between two specified dates.
+    Get the total money spent between two specified dates, in cents.
     :param dates: The tuple containing the starting and ending dates. Note: dates[0] - start_date, dates[1] - end_date.
     :param user_id: The id of the current user.
     :raises NoTotalBetweenDates: Exception to be raised when there is no data between the start and end dates.
-    :return: The total money spent between starting_date and ending_date
+    :return: The total number of cents spent between starting_date and ending_date
     """
-    db = DB(_globals.DATABASE)
-    total = db.fetchall(
-        f"SELECT SUM(Amount) "
-        f"FROM Transactions "
-        f"WHERE Date BETWEEN DATE('{dates[0]}') AND DATE('{dates[1]}') AND User_id=?;",
-        values=(user_id,))[0][0]
-    db.close()
+    cache = get_transaction_cache(user_id)
+    if cache is not None:
+        total = cache.get_total(dates)
+    else:
+        db = DB(_globals.DATABASE)
+        total = db.fetch_named("SELECT_TOTAL_BETWEEN_DATES", values=(user_id, dates[0], dates[1]))[0][0]
+        db.close()
 
     if total is not None:
-        return round(float(total), 2)
+        return total
 
     raise NoTotalBetweenDates(format_date_pretty(dates[0]), format_date_pretty(dates[1]))
+
+
+def get_total_between_dates(dates: tuple, user_id: int) -> float:
+    """
+    Get the total money spent between two specified dates.
+    :param dates: The tuple containing the starting and ending dates. Note: dates[0] - start_date, dates[1] - end_date.
+    :param user_id: The id of the current user.
+    :raises NoTotalBetweenDates: Exception to be raised when there is no data between the start and end dates.
+    :return: The total money spent between starting_date and ending_date
+    """
+    return format_cents_to_amount(get_cents_between_dates(dates, user_id))
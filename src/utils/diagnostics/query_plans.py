@@ -0,0 +1,78 @@
+"""
+Print the query plan of every report query, and flag the queries that scan a whole table.
+
+Run from the 'src' directory:
+    python3 -m utils.diagnostics.query_plans
+"""
+from objects.interface.dbconn import DB, query_registry
+import utils.globals as _globals
+from utils.aggregator.aggregator import get_aggregate_query
+from utils.enums import Buckets
+from utils.print import print_message, print_error
+
+# The report queries to check, along with sample parameters to bind while explaining them.
+REPORT_QUERIES = {
+    'years and counts (per user)': (_globals.SELECT_YEAR_COUNTS, (1,)),
+    'total between dates': (_globals.SELECT_TOTAL_BETWEEN_DATES, (1, '2021-01-01', '2021-12-31')),
+    'average between dates': (_globals.SELECT_AVERAGE_BETWEEN_DATES, (1, '2021-01-01', '2021-12-31')),
+    'earliest date': (_globals.SELECT_EARLIEST_DATE, (1,)),
+    'latest date': (_globals.SELECT_LATEST_DATE, (1,)),
+}
+for bucket in Buckets:
+    for dates in (('2021-01-01', '2021-12-31'), ('2021-01-15', '2021-03-14')):
+        name, bounds = get_aggregate_query(bucket, dates)
+        REPORT_QUERIES[f"total per {bucket.name.lower()} ({dates[0]} - {dates[1]})"] = (query_registry.get_query(name),
+                                                                                       (1,) + tuple(bounds))
+
+
+def is_full_scan(detail: str) -> bool:
+    """
+    Determine if a step of a query plan reads every row of a table.
+    :param detail: The detail column of an 'EXPLAIN QUERY PLAN' row (e.g. 'SCAN Transactions').
+    :return: True if the step scans the table itself rather than searching or scanning an index.
+    """
+    return detail.startswith("SCAN") and "INDEX" not in detail
+
+
+def explain(db: DB, query: str, values: tuple) -> list:
+    """
+    Retrieve the query plan of a query.
+    :param db: The database connection.
+    :param query: The query to explain.
+    :param values: The values associated with the query.
+    :return: A list containing the detail of each step of the plan.
+    """
+    return [row[3] for row in db.fetchall(f"EXPLAIN QUERY PLAN {query}", values=values)]
+
+
+def check_query_plans(db: DB) -> bool:
+    """
+    Print the query plan of every report query.
+    :param db: The database connection.
+    :return: True if none of the report queries scan a whole table. False otherwise.
+    """
+    all_indexed = True
+    for name, (query, values) in REPORT_QUERIES.items():
+        plan = explain(db, query, values)
+        full_scans = [detail for detail in plan if is_full_scan(detail)]
+        print_message(f"{name}:")
+        for detail in plan:
+            print_message(f"\t{detail}")
+        if full_scans:
+            print_error(f"\t'{name}' performs a full table scan.")
+            all_indexed = False
+    return all_indexed
+
+
+def main() -> None:
+    db = DB(_globals.DATABASE)
+    db.setup_tables()
+    db.setup_indexes()
+    db.setup_triggers()
+    all_indexed = check_query_plans(db)
+    db.close()
+    exit(0 if all_indexed else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -36,6 +36,27 @@ class Charts(Enum):
     PIE = auto()
 
 
+class Buckets(Enum):
+    """
+    This class is used to represent the different ways transactions can be grouped together when aggregated.
+    """
+    DAY = auto()
+    MONTH = auto()
+    YEAR = auto()
+    MERCHANT = auto()
+
+
+class Reports(Enum):
+    """
+    This class is used to represent the reports that can be generated without the menu, in batch mode.
+    """
+    DAILY = auto()
+    MONTHLY = auto()
+    YEARLY = auto()
+    MERCHANTS = auto()
+    AVERAGE = auto()
+
+
 class SettingsSelection(Enum):
     CHANGE_USERNAME = 1
     CHANGE_PASSWORD = 2
@@ -82,3 +82,47 @@ class InvalidYear(Exception):
 
     def __str__(self):
         return "Invalid year."
+
+
+class InvalidPaymentRule(Exception):
+    """
+    Exception to be raised when a payment classification rule refers to a column an account's exports do not have.
+    """
+    def __init__(self, *args):
+        self.message = f"The payment rules for '{args[0]}' refer to the unknown column '{args[1]}'."
+
+    def __str__(self):
+        return "Invalid payment rule."
+
+
+class InvalidReport(Exception):
+    """
+    Exception to be raised when a batch report specification cannot be run.
+    """
+    def __init__(self, *args):
+        self.message = f"Invalid report specification: {args[0]}."
+
+    def __str__(self):
+        return "Invalid report."
+
+
+class InvalidDatabaseProfile(Exception):
+    """
+    Exception to be raised when a database tuning profile does not exist.
+    """
+    def __init__(self, *args):
+        self.message = f"The database profile '{args[0]}' does not exist."
+
+    def __str__(self):
+        return "Invalid database profile."
+
+
+class UnknownQuery(Exception):
+    """
+    Exception to be raised when a statement has not been registered within the query registry.
+    """
+    def __init__(self, *args):
+        self.message = f"The query '{args[0]}' has not been registered."
+
+    def __str__(self):
+        return "Unknown query."
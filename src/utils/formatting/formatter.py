@@ -1,6 +1,11 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
 import utils.globals as _globals
 from utils.enums import Months, month_string_to_enum
 
+# The ordinal of 1970-01-01, the day numbered 0 by format_date_to_day_number().
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
 
 def format_month_enum_to_string(month: Months):
     """
@@ -44,3 +49,44 @@ def format_date_pretty(date_to_format: str) -> str:
     year = date_array[0]
 
     return f"{month} {day}, {year}"
+
+
+def format_date_to_day_number(date_to_format: str):
+    """
+    Convert a date in the YYYY-MM-DD format into its day number: the number of days since 1970-01-01.
+    Day numbers are stored alongside the dates so that date ranges are compared as integers.
+    :param date_to_format: The date to convert.
+    :return: The day number, or None if the date is not a valid date.
+    """
+    try:
+        year, month, day = date_to_format.split("-")
+        return date(int(year), int(month), int(day)).toordinal() - EPOCH_ORDINAL
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_amount_to_cents(amount: str):
+    """
+    Convert a monetary amount from an export (e.g. '-1,234.56') into an integer number of cents.
+    :param amount: The amount to convert.
+    :return: The amount in cents, or None if the amount is empty or is not a number.
+    """
+    amount = amount.strip().replace(',', '').replace('$', '') if amount is not None else ''
+    if amount == '':
+        return None
+    try:
+        cents = (Decimal(amount) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return None
+    if not cents.is_finite():
+        return None
+    return int(cents)
+
+
+def format_cents_to_amount(cents: int) -> float:
+    """
+    Convert an integer number of cents back into a monetary amount.
+    :param cents: The number of cents to convert.
+    :return: The monetary amount, rounded to two decimal places.
+    """
+    return round(cents / 100, 2)
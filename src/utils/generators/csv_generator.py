@@ -18,6 +18,22 @@ MAX_TRANSACTIONS = 100
 MIN_SPENT = 0.00
 MAX_SPENT = 250.00
 
+# The reference lists read by load_reference_list(), keyed by file.
+_reference_lists = {}
+
+
+def load_reference_list(file: str) -> list:
+    """
+    Retrieve the lines of a reference list, such as the list of companies, reading the file the first time it is
+    needed.
+    :param file: The text file containing one entry per line.
+    :return: The list of entries, without blank lines.
+    """
+    if file not in _reference_lists:
+        with open(file) as reference_file:
+            _reference_lists[file] = [line.strip() for line in reference_file if line.strip() != '']
+    return _reference_lists[file]
+
 
 def random_date(start_date: str, end_date: str):
     """
@@ -42,6 +58,11 @@ def generate_apple_files(user: User, year: str) -> None:
     :param user: The current user requesting to generate new data.
     :param year: The year to generate data for.
     """
+    # Select the user-specified currency acronym
+    type_of_currency = get_currency_acronym(user.currency_id)
+    companies = load_reference_list(_globals.COMPANIES)
+    categories = load_reference_list(_globals.APPLE_CARD_CATEGORIES)
+
     for m in _globals.months:
         # Convert the month string to an enum
         month = month_string_to_enum(m)
@@ -58,9 +79,6 @@ def generate_apple_files(user: User, year: str) -> None:
         # Create the name of the file
         name_of_file = f"Apple Card Transactions - {_globals.months[month.name]} {year}.csv"
 
-        # Select the user-specified currency acronym
-        type_of_currency = get_currency_acronym(user.currency_id)
-
         # The header to be displayed at the top of the csv file
         csv_header = ["Transaction", "Clearing Date", "Description", "Merchant", "Category", "Type",
                       f"Amount ({type_of_currency})"]
@@ -74,11 +92,8 @@ def generate_apple_files(user: User, year: str) -> None:
             for day in sorted(list_of_days, reverse=True):
                 transaction_date = clearing_date = day
                 description = "This information was randomly generated"
-                merchant = random.choice(
-                    open(os.path.abspath('../src/utils/helper_files/txt/companies.txt')).readlines()).strip('\n')
-                category = random.choice(
-                    open(os.path.abspath('../src/utils/helper_files/txt/apple_card_categories.txt')).readlines()).strip(
-                    '\n')
+                merchant = random.choice(companies)
+                category = random.choice(categories)
                 type = "Purchase"
                 amount = f"{round(random.uniform(MIN_SPENT, MAX_SPENT), 2):.2f}"
 
@@ -98,6 +113,7 @@ def generate_esl_files(user: User, year: str) -> None:
     name_of_file = f"Export-{dt.month:02d}{dt.day:02d}{dt.year}-{time.replace(':', '')}"
     member_number = user.id
     account_id = random.randint(1000000, 9999999999)
+    companies = load_reference_list(_globals.COMPANIES)
 
     list_of_days = []
     for m in _globals.months:
@@ -135,8 +151,7 @@ def generate_esl_files(user: User, year: str) -> None:
             transaction_number = f"{date[2]}{date[0]}{date[1]}{random.randint(1000000, 9999999999)}"
             date = d
             description = "This information was randomly generated"
-            memo = random.choice(
-                open(os.path.abspath('../src/utils/helper_files/txt/companies.txt')).readlines()).strip('\n')
+            memo = random.choice(companies)
             # Want to use negatives for money spent (amount_debit/amount_credit) in this csv
             amount_debit = f"{-round(random.uniform(MIN_SPENT, MAX_SPENT), 2):.2f}"
             amount_credit = None
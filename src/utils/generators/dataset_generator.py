@@ -0,0 +1,292 @@
+"""
+Generate a large, reproducible dataset of Apple Card and ESL exports for load testing.
+Every user spends on each day of every year, at merchants drawn from a Zipf distribution over the list of companies,
+and the exports include the paychecks, card payments and transfers that the payment rules filter out.
+
+Run from the 'src' directory:
+    python3 -m utils.generators.dataset_generator --users 10 --years 5 --rows_per_day 20 --seed 0
+    python3 -m utils.generators.dataset_generator --users 10 --years 5 --output sqlite --database ../load.db
+"""
+import csv
+import os
+import time
+from argparse import ArgumentParser
+from contextlib import nullcontext
+import numpy as np
+from objects.interface.dbconn import DB
+from objects.user.Currency import get_currency
+from objects.user.User import User
+import utils.globals as _globals
+from utils.cache.cache import invalidate_transaction_cache
+from utils.encryption.encrypt import encrypt_string
+from utils.exceptions import UserNotFound
+from utils.generators.csv_generator import load_reference_list
+from utils.importers.importers import IMPORTERS
+from utils.print import print_message
+from utils.startup import currency_startup, db_startup
+from utils.user.user_helper import get_user
+
+# The median purchase, and how widely purchases spread around it (the sigma of a log-normal distribution).
+MEDIAN_PURCHASE_CENTS = 2500
+PURCHASE_SPREAD = 1.0
+MAX_PURCHASE_CENTS = 250000
+
+# The share of purchases made with the Apple Card. The remaining purchases are made with the ESL debit card.
+APPLE_SHARE = 0.5
+
+# Paychecks are deposited into the ESL account every PAY_PERIOD days, and cover PAY_MARGIN times the expected
+# spending of the period. The Apple Card is paid off from the ESL account at the end of every month.
+PAY_PERIOD = 14
+PAY_MARGIN = 1.05
+OPENING_BALANCE_CENTS = 500000
+
+# The kinds of rows of an ESL export, in the order they are applied to the balance within a day.
+ESL_PAYCHECK, ESL_PURCHASE, ESL_CARD_PAYMENT = 0, 1, 2
+
+# The header of an Apple Card export, and the header rows of an ESL export.
+APPLE_HEADER = ["Transaction Date", "Clearing Date", "Description", "Merchant", "Category", "Type", "Amount (USD)"]
+ESL_HEADER = ["Transaction Number", "Date", "Description", "Memo", "Amount Debit", "Amount Credit", "Balance",
+              "Check Number", "Fees"]
+
+
+def get_zipf_weights(count: int, exponent: float) -> np.ndarray:
+    """
+    Compute the probability of each rank of a Zipf distribution truncated to a number of ranks.
+    :param count: The number of ranks.
+    :param exponent: The exponent of the distribution. Larger exponents concentrate the draws on the first ranks.
+    :return: The probability of each rank, starting with the first.
+    """
+    weights = np.arange(1, count + 1, dtype=np.float64) ** -exponent
+    return weights / weights.sum()
+
+
+def format_cents(cents: list) -> list:
+    """
+    Format amounts in cents as they appear within an export.
+    :param cents: The positive amounts, in cents.
+    :return: The amounts as strings with two decimal places.
+    """
+    return [f"{amount // 100}.{amount % 100:02d}" for amount in cents]
+
+
+def generate_year(rng: np.random.Generator, year: int, rows_per_day: float, merchants: list, categories: list,
+                  weights: np.ndarray, balance: int) -> (list, list, int):
+    """
+    Generate one year of a user's Apple Card and ESL exports.
+    :param rng: The random number generator of the user.
+    :param year: The year to generate.
+    :param rows_per_day: The average number of purchases made per day.
+    :param merchants: The merchants, ordered from the user's most to least frequent.
+    :param categories: The Apple Card category of each merchant.
+    :param weights: The probability of each merchant being chosen for a purchase.
+    :param balance: The balance of the ESL account at the start of the year, in cents.
+    :return: A tuple containing the Apple Card rows and the ESL rows, each newest first as they appear within an
+             export, and the balance of the ESL account at the end of the year.
+    """
+    days = np.arange(np.datetime64(f"{year}-01-01"), np.datetime64(f"{year + 1}-01-01"))
+    day_names = [f"{day.month:02d}/{day.day:02d}/{day.year}" for day in days.tolist()]
+    months = (days.astype('datetime64[M]') - np.datetime64(f"{year}-01", 'M')).astype(np.int64)
+    month_ends = np.flatnonzero(np.concatenate((months[1:] != months[:-1], [True])))
+
+    # Draw every purchase of the year at once. Purchases are ordered by day.
+    purchase_days = np.repeat(np.arange(len(days)), rng.poisson(rows_per_day, size=len(days)))
+    purchase_merchants = rng.choice(len(merchants), size=len(purchase_days), p=weights)
+    purchase_cents = np.clip(np.rint(rng.lognormal(np.log(MEDIAN_PURCHASE_CENTS), PURCHASE_SPREAD,
+                                                   size=len(purchase_days))), 1, MAX_PURCHASE_CENTS).astype(np.int64)
+    on_apple_card = rng.random(len(purchase_days)) < APPLE_SHARE
+
+    # Apple Card purchases, followed by the payment of each month's balance on the last day of the month.
+    apple = np.flatnonzero(on_apple_card)
+    apple_amounts = format_cents(purchase_cents[apple].tolist())
+    apple_rows = [[day_names[day], day_names[day], f"{merchants[merchant].upper()} #{year}{index:07d}",
+                   merchants[merchant], categories[merchant], "Purchase", amount]
+                  for index, day, merchant, amount in zip(apple.tolist(), purchase_days[apple].tolist(),
+                                                          purchase_merchants[apple].tolist(), apple_amounts)]
+    card_balances = np.bincount(months[purchase_days[apple]], weights=purchase_cents[apple],
+                                minlength=len(month_ends)).astype(np.int64)
+    card_payments = [(day, cents) for day, cents in zip(month_ends.tolist(), card_balances.tolist()) if cents > 0]
+    for day, amount in zip([day for day, _ in card_payments], format_cents([cents for _, cents in card_payments])):
+        apple_rows.append([day_names[day], day_names[day], "ACH DEPOSIT INTERNET TRANSFER FROM ACCOUNT ENDING IN 0000",
+                           "Apple Card", "Payment", "Payment", f"-{amount}"])
+
+    # ESL debit card purchases, paychecks, and the transfers paying off the Apple Card.
+    esl = np.flatnonzero(~on_apple_card)
+    paycheck_days = np.arange(int(rng.integers(PAY_PERIOD)), len(days), PAY_PERIOD)
+    paycheck_cents = int(rows_per_day * MEDIAN_PURCHASE_CENTS * np.exp(PURCHASE_SPREAD ** 2 / 2) * PAY_PERIOD
+                         * PAY_MARGIN)
+
+    kinds = np.concatenate((np.full(len(esl), ESL_PURCHASE), np.full(len(paycheck_days), ESL_PAYCHECK),
+                            np.full(len(card_payments), ESL_CARD_PAYMENT)))
+    event_days = np.concatenate((purchase_days[esl], paycheck_days,
+                                 [day for day, _ in card_payments])).astype(np.int64)
+    event_cents = np.concatenate((-purchase_cents[esl], np.full(len(paycheck_days), paycheck_cents),
+                                  [-cents for _, cents in card_payments])).astype(np.int64)
+    merchant_ids = np.concatenate((purchase_merchants[esl], np.full(len(paycheck_days) + len(card_payments), -1)))
+
+    order = np.lexsort((kinds, event_days))
+    balances = balance + np.cumsum(event_cents[order])
+    amounts = format_cents(np.abs(event_cents[order]).tolist())
+    balance_texts = [f"{'-' if cents < 0 else ''}{text}"
+                     for cents, text in zip(balances.tolist(), format_cents(np.abs(balances).tolist()))]
+
+    esl_rows = []
+    for position, (day, kind, merchant, amount, balance_text) in enumerate(zip(
+            event_days[order].tolist(), kinds[order].tolist(), merchant_ids[order].tolist(), amounts, balance_texts)):
+        number = f"{day_names[day][6:]}{day_names[day][:2]}{day_names[day][3:5]}{position:07d}"
+        if kind == ESL_PURCHASE:
+            row = [number, day_names[day], "Point Of Sale Withdrawal", merchants[merchant], f"-{amount}", "",
+                   balance_text, "", ""]
+        elif kind == ESL_PAYCHECK:
+            row = [number, day_names[day], "ACH Deposit PAYROLL", "- PAYROLL", "", amount, balance_text, "", ""]
+        else:
+            row = [number, day_names[day], "Withdrawal Internet Transfer to", "- PAYMENT", f"-{amount}", "",
+                   balance_text, "", ""]
+        esl_rows.append(row)
+
+    apple_rows.sort(key=lambda row: row[0][6:] + row[0][:5], reverse=True)
+    esl_rows.reverse()
+    return apple_rows, esl_rows, int(balances[-1]) if len(balances) > 0 else balance
+
+
+def write_upload_files(directory: str, username: str, year: int, apple_rows: list, esl_rows: list) -> None:
+    """
+    Write a year of exports in the layout of the 'Upload' folder: one Apple Card export per month, and one ESL
+    export per year.
+    :param directory: The folder containing the 'Apple' and 'ESL' folders.
+    :param username: The user the exports belong to.
+    :param year: The year of the exports.
+    :param apple_rows: The Apple Card rows, newest first.
+    :param esl_rows: The ESL rows, newest first.
+    """
+    apple_folder = os.path.join(directory, "Apple")
+    esl_folder = os.path.join(directory, "ESL")
+    os.makedirs(apple_folder, exist_ok=True)
+    os.makedirs(esl_folder, exist_ok=True)
+
+    rows_per_month = {}
+    for row in apple_rows:
+        rows_per_month.setdefault(row[0][:2], []).append(row)
+
+    for number, month in enumerate(_globals.months.values(), start=1):
+        with open(os.path.join(apple_folder, f"Apple Card Transactions - {month} {year}.csv"), 'w',
+                  newline='') as file:
+            writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)
+            writer.writerow(APPLE_HEADER)
+            writer.writerows(rows_per_month.get(f"{number:02d}", []))
+
+    with open(os.path.join(esl_folder, f"Export-{username}-{year}.csv"), 'w', newline='') as file:
+        writer = csv.writer(file, quoting=csv.QUOTE_NONNUMERIC)
+        writer.writerow(["Account Name : Generated"])
+        writer.writerow([f"Account Number : {username}"])
+        writer.writerow([f"Date Range : 01/01/{year}-12/31/{year}"])
+        writer.writerow(ESL_HEADER)
+        writer.writerows(esl_rows)
+
+
+def insert_rows(db: DB, user_id: int, apple_rows: list, esl_rows: list) -> int:
+    """
+    Insert a year of exports straight into the database, through the same row builders as an upload.
+    :param db: The database connection.
+    :param user_id: The id of the user the exports belong to.
+    :param apple_rows: The Apple Card rows.
+    :param esl_rows: The ESL rows.
+    :return: The number of receipts inserted.
+    """
+    inserted = 0
+    with db.transaction():
+        for account, rows in (("Apple", apple_rows), ("ESL", esl_rows)):
+            importer = IMPORTERS[account]
+            receipt_rows, transaction_rows = importer.build_rows(rows, user_id)
+            inserted += db.execute_many_named(importer.insert_query, receipt_rows)
+            db.execute_many_named("INSERT_TRANSACTIONS", transaction_rows)
+    return inserted
+
+
+def get_or_create_user(username: str, password: str) -> User:
+    """
+    Retrieve a generated user, creating them with US dollars as their currency if they do not exist yet.
+    :param username: The username of the user.
+    :param password: The password to create the user with.
+    :return: The user.
+    """
+    try:
+        return get_user(username)
+    except UserNotFound:
+        user = User(DB(_globals.DATABASE), username=username, password_hash=encrypt_string(password))
+        user.firstname = "Generated"
+        user.surname = username
+        user.currency_id = get_currency("USD").get_id()
+        user.has_first_sign_in = True
+        user.create_user()
+        return get_user(username)
+
+
+def main() -> None:
+    parser = ArgumentParser()
+    parser.add_argument('--users', type=int, default=1, help='the number of users to generate.')
+    parser.add_argument('--years', type=int, default=1, help='the number of years to generate per user.')
+    parser.add_argument('--start_year', type=int, default=2015, help='the first year to generate.')
+    parser.add_argument('--rows_per_day', type=float, default=5, help='the average number of purchases per day.')
+    parser.add_argument('--zipf', type=float, default=1.1,
+                        help='the exponent of the Zipf distribution the merchants are drawn from.')
+    parser.add_argument('--seed', type=int, default=0, help='the seed used to generate the dataset.')
+    parser.add_argument('--output', choices=['upload', 'sqlite'], default='upload',
+                        help='write exports to the \'Upload\' folder layout, or insert them straight into a database.')
+    parser.add_argument('--directory', default=_globals.UPLOAD_FOLDER,
+                        help='the folder to write the exports to. With more than one user, each user\'s exports are '
+                             'written to a folder named after them.')
+    parser.add_argument('--database', default=_globals.DATABASE, help='the database to insert the exports into.')
+    parser.add_argument('--prefix', default='loadtest', help='the prefix of the generated usernames.')
+    parser.add_argument('--password', default='password', help='the password of the generated users.')
+    args = parser.parse_args()
+
+    companies = load_reference_list(_globals.COMPANIES)
+    all_categories = load_reference_list(_globals.APPLE_CARD_CATEGORIES)
+    weights = get_zipf_weights(len(companies), args.zipf)
+
+    # Every merchant keeps the same category across users.
+    seeds = np.random.SeedSequence(args.seed)
+    merchant_rng = np.random.default_rng(seeds.spawn(1)[0])
+    merchant_categories = dict(zip(companies, merchant_rng.choice(all_categories, size=len(companies)).tolist()))
+
+    db = None
+    if args.output == 'sqlite':
+        _globals.DATABASE = os.path.abspath(args.database)
+        db_startup.startup()
+        currency_startup.startup()
+        db = DB(_globals.DATABASE)
+
+    start = time.perf_counter()
+    rows = 0
+    with db.profile(_globals.INGEST_DATABASE_PROFILE) if db is not None else nullcontext():
+        # Each user draws from their own stream, so a user's data does not depend on how many users are generated.
+        for number, user_seed in enumerate(seeds.spawn(args.users + 1)[1:], start=1):
+            rng = np.random.default_rng(user_seed)
+            username = f"{args.prefix}{number}"
+            merchants = [companies[index] for index in rng.permutation(len(companies))]
+            categories = [merchant_categories[merchant] for merchant in merchants]
+            user_id = get_or_create_user(username, args.password).id if db is not None else None
+            directory = args.directory if args.users == 1 else os.path.join(args.directory, username)
+
+            balance = OPENING_BALANCE_CENTS
+            for year in range(args.start_year, args.start_year + args.years):
+                apple_rows, esl_rows, balance = generate_year(rng, year, args.rows_per_day, merchants, categories,
+                                                              weights, balance)
+                if db is not None:
+                    insert_rows(db, user_id, apple_rows, esl_rows)
+                else:
+                    write_upload_files(directory, username, year, apple_rows, esl_rows)
+                rows += len(apple_rows) + len(esl_rows)
+
+            if db is not None:
+                invalidate_transaction_cache(user_id)
+
+    if db is not None:
+        db.close()
+    elapsed = time.perf_counter() - start
+    print_message(f"Generated {rows:,} rows for {args.users} users in {elapsed:,.1f} seconds "
+                  f"({rows / elapsed:,.0f} rows/sec).")
+
+
+if __name__ == '__main__':
+    main()
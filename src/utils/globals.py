@@ -10,6 +10,13 @@ LOG_FILE = os.path.abspath('../transactionstrackr.log')
 # CSV file containing the currencies this application can support
 CURRENCIES = os.path.abspath('../src/utils/helper_files/csv/currencies.csv')
 
+# JSON file containing the rules used to determine which receipts of each account are payments
+PAYMENT_RULES = os.path.abspath('../src/utils/helper_files/json/payment_rules.json')
+
+# Text files listing the merchants and the Apple Card categories used to generate random exports
+COMPANIES = os.path.abspath('../src/utils/helper_files/txt/companies.txt')
+APPLE_CARD_CATEGORIES = os.path.abspath('../src/utils/helper_files/txt/apple_card_categories.txt')
+
 # The folder the user will upload their files to
 UPLOAD_FOLDER = os.path.abspath('../Upload')
 APPLE_UPLOAD_FOLDER = os.path.abspath('../Upload/Apple')
@@ -24,6 +31,25 @@ FOLDER_UPLOADS = [
 # The folder that will hold all of the users data
 USERS_FOLDER = os.path.abspath('../Users')
 
+# The folder charts are rendered to, named after the hash of their data and style
+CHARTS_FOLDER = os.path.abspath('../Charts')
+
+# The image format ('png' or 'svg') charts are rendered to instead of being displayed, or None to display them
+RENDER_FORMAT = None
+
+# The version of the chart style. Increment it whenever the appearance of the charts changes, so that charts
+# rendered with the previous style are not reused.
+CHART_STYLE_VERSION = 1
+
+# The number of seconds between each scan of the 'Upload' folder when inotify is not available.
+FOLDER_POLL_INTERVAL = 1.0
+
+# The number of worker processes used to parse uploaded files. A single worker parses within the current process.
+INGEST_WORKERS = 1
+
+# Boolean to determine whether reports are answered from an in-memory copy of the user's transactions.
+USE_TRANSACTION_CACHE = True
+
 # Command used to create the 'Currencies' table
 CREATE_CURRENCY_TABLE = '''CREATE TABLE IF NOT EXISTS Currencies(
                             id integer PRIMARY KEY AUTOINCREMENT,
@@ -32,6 +58,44 @@ CREATE_CURRENCY_TABLE = '''CREATE TABLE IF NOT EXISTS Currencies(
                             Symbol text
                         );'''
 
+# The tuning profiles database connections can be configured with. Note: The form of each profile is { pragma : value }.
+#   safe:        durable commits. WAL lets readers continue while the upload thread writes.
+#   fast-ingest: commits are not synced until a checkpoint, with a large page cache, for bulk imports.
+#   read-mostly: memory-mapped reads and a large page cache, for report-heavy sessions.
+DATABASE_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -8192,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT"
+    },
+    "fast-ingest": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,
+        "mmap_size": 0,
+        "temp_store": "MEMORY"
+    },
+    "read-mostly": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -32768,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY"
+    }
+}
+
+# The tuning profile used by default, and the profile switched to while files are being inserted
+DATABASE_PROFILE = "safe"
+INGEST_DATABASE_PROFILE = "fast-ingest"
+
+# Command used to create the 'Metadata' table, holding the settings and checksums of the database
+CREATE_METADATA_TABLE = '''CREATE TABLE IF NOT EXISTS Metadata(
+                            Key text PRIMARY KEY,
+                            Value text
+                        ) WITHOUT ROWID;'''
+
 # Command used to create the 'Users' table
 CREATE_USER_TABLE = '''CREATE TABLE IF NOT EXISTS Users(
                         id integer PRIMARY KEY AUTOINCREMENT,
@@ -46,13 +110,18 @@ CREATE_USER_TABLE = '''CREATE TABLE IF NOT EXISTS Users(
                         FOREIGN KEY(Currency_id) references Currencies(id)
                     );'''
 
-# Command used to create the 'CSVFiles' table
-# CREATE_CSV_TABLE = '''CREATE TABLE IF NOT EXISTS CSVFiles(
-#                         id integer PRIMARY KEY AUTOINCREMENT,
-#                         Name text NOT NULL,
-#                         User_id integer,
-#                         FOREIGN KEY(User_id) references Users(id)
-#                     );'''
+# Command used to create the 'CSVFiles' table, the manifest of every file that has been inserted for a user
+CREATE_CSV_TABLE = '''CREATE TABLE IF NOT EXISTS CSVFiles(
+                        id integer PRIMARY KEY AUTOINCREMENT,
+                        Path text NOT NULL,
+                        Size integer NOT NULL,
+                        Modified integer NOT NULL,
+                        Hash text NOT NULL,
+                        Row_Count integer NOT NULL,
+                        User_id integer,
+                        FOREIGN KEY(User_id) references Users(id),
+                        UNIQUE(User_id, Path)
+                    );'''
 
 # Command used to create the 'AppleReceipts' table
 CREATE_APPLE_TABLE = '''CREATE TABLE IF NOT EXISTS AppleReceipts(
@@ -64,10 +133,12 @@ CREATE_APPLE_TABLE = '''CREATE TABLE IF NOT EXISTS AppleReceipts(
                           Category text NOT NULL,
                           Type text NOT NULL,
                           Amount text NOT NULL,
+                          Amount_Cents integer,
                           Card_Type text NOT NULL,
                           Is_Payment integer NOT NULL,
                           Is_Transaction integer NOT NULL,
                           User_id integer NOT NULL,
+                          Fingerprint text,
                           FOREIGN KEY(User_id) references Users(id)
                         );'''
 
@@ -81,12 +152,16 @@ CREATE_ESL_TABLE = '''CREATE TABLE IF NOT EXISTS ESLReceipts(
                         Amount_Debit text NOT NULL,
                         Amount_Credit text NOT NULL,
                         Balance text NOT NULL,
+                        Amount_Debit_Cents integer,
+                        Amount_Credit_Cents integer,
+                        Balance_Cents integer,
                         Check_Number text NOT NULL,
                         Fees text NOT NULL,
                         Card_Type text NOT NULL,
                         Is_Payment integer NOT NULL,
                         Is_Transaction integer NOT NULL,
                         User_id integer NOT NULL,
+                        Fingerprint text,
                         FOREIGN KEY(User_id) references Users(id)
                     );'''
 
@@ -94,28 +169,238 @@ CREATE_ESL_TABLE = '''CREATE TABLE IF NOT EXISTS ESLReceipts(
 CREATE_TRANSACTIONS_TABLE = '''CREATE TABLE IF NOT EXISTS Transactions(
                                 id integer PRIMARY KEY AUTOINCREMENT, 
                                 Date text NOT NULL,
+                                Day_Number integer,
                                 Amount text NOT NULL,
+                                Amount_Cents integer,
                                 Card_Type text NOT NULL,
                                 Merchant text NOT NULL,
                                 Description text NOT NULL,
                                 ESL_id integer,
                                 Apple_id integer,
                                 User_id integer NOT NULL,
+                                Fingerprint text,
                                 FOREIGN KEY(User_id) references Users(id),
                                 FOREIGN KEY(ESL_id) references ESLReceipts(id),
                                 FOREIGN KEY(Apple_id) references AppleReceipts(id)
                            );'''
 
+# Commands used to create the spending rollup tables, which hold each user's total spent and number of transactions
+# per day, month, and year. They are maintained by the rollup triggers on the 'Transactions' table.
+CREATE_DAILY_SPEND_TABLE = '''CREATE TABLE IF NOT EXISTS DailySpend(
+                                User_id integer NOT NULL,
+                                Day text NOT NULL,
+                                Total_Cents integer NOT NULL,
+                                Count integer NOT NULL,
+                                PRIMARY KEY(User_id, Day)
+                            ) WITHOUT ROWID;'''
+CREATE_MONTHLY_SPEND_TABLE = '''CREATE TABLE IF NOT EXISTS MonthlySpend(
+                                  User_id integer NOT NULL,
+                                  Month text NOT NULL,
+                                  Total_Cents integer NOT NULL,
+                                  Count integer NOT NULL,
+                                  PRIMARY KEY(User_id, Month)
+                              ) WITHOUT ROWID;'''
+CREATE_YEARLY_SPEND_TABLE = '''CREATE TABLE IF NOT EXISTS YearlySpend(
+                                 User_id integer NOT NULL,
+                                 Year text NOT NULL,
+                                 Total_Cents integer NOT NULL,
+                                 Count integer NOT NULL,
+                                 PRIMARY KEY(User_id, Year)
+                             ) WITHOUT ROWID;'''
+
 # List to contain all of the create table commands
 TABLES = [
+    CREATE_METADATA_TABLE,
     CREATE_CURRENCY_TABLE,
     CREATE_USER_TABLE,
-    # CREATE_CSV_TABLE,
+    CREATE_CSV_TABLE,
     CREATE_APPLE_TABLE,
     CREATE_ESL_TABLE,
-    CREATE_TRANSACTIONS_TABLE
+    CREATE_TRANSACTIONS_TABLE,
+    CREATE_DAILY_SPEND_TABLE,
+    CREATE_MONTHLY_SPEND_TABLE,
+    CREATE_YEARLY_SPEND_TABLE
 ]
 
+# The spending rollup tables: (table, key column, length of the 'Date' prefix the table is keyed by).
+# Unlike the 'Transactions' table, the rollups stay keyed by text rather than by day number. Months and years have no
+# day number of their own. The fixed-width YYYY-MM-DD prefixes sort in date order, so a date range is still a single
+# search of the rollup's primary key. The keys also double as the buckets returned by the reports.
+SPENDING_ROLLUPS = (
+    ('DailySpend', 'Day', 10),
+    ('MonthlySpend', 'Month', 7),
+    ('YearlySpend', 'Year', 4)
+)
+
+# Statements used within the rollup triggers to add a new transaction to, or remove an old transaction from, a rollup.
+# Transactions without a day number are left out, as they are from the transaction cache and the date bounds, so that
+# the rollups count the same transactions.
+ADD_TO_ROLLUP = '''INSERT INTO {table}(User_id, {key}, Total_Cents, Count)
+                   SELECT NEW.User_id, substr(NEW.Date, 1, {length}), IFNULL(NEW.Amount_Cents, 0), 1
+                   WHERE NEW.Day_Number IS NOT NULL
+                   ON CONFLICT(User_id, {key}) DO UPDATE SET Total_Cents=Total_Cents + excluded.Total_Cents,
+                                                             Count=Count + 1;'''
+REMOVE_FROM_ROLLUP = '''UPDATE {table}
+                        SET Total_Cents=Total_Cents - IFNULL(OLD.Amount_Cents, 0), Count=Count - 1
+                        WHERE User_id=OLD.User_id AND {key}=substr(OLD.Date, 1, {length})
+                              AND OLD.Day_Number IS NOT NULL;
+                        DELETE FROM {table}
+                        WHERE User_id=OLD.User_id AND {key}=substr(OLD.Date, 1, {length}) AND Count<=0;'''
+ADD_TO_ROLLUPS = "".join(ADD_TO_ROLLUP.format(table=table, key=key, length=length)
+                         for table, key, length in SPENDING_ROLLUPS)
+REMOVE_FROM_ROLLUPS = "".join(REMOVE_FROM_ROLLUP.format(table=table, key=key, length=length)
+                              for table, key, length in SPENDING_ROLLUPS)
+
+# Commands used to create the triggers that keep the spending rollups up to date within the same transaction
+# as every insert, delete, and update of the 'Transactions' table.
+CREATE_ROLLUP_INSERT_TRIGGER = f'''CREATE TRIGGER IF NOT EXISTS Transactions_Rollup_Insert
+                                   AFTER INSERT ON Transactions
+                                   BEGIN {ADD_TO_ROLLUPS} END;'''
+CREATE_ROLLUP_DELETE_TRIGGER = f'''CREATE TRIGGER IF NOT EXISTS Transactions_Rollup_Delete
+                                   AFTER DELETE ON Transactions
+                                   BEGIN {REMOVE_FROM_ROLLUPS} END;'''
+CREATE_ROLLUP_UPDATE_TRIGGER = f'''CREATE TRIGGER IF NOT EXISTS Transactions_Rollup_Update
+                                   AFTER UPDATE OF Date, Day_Number, Amount_Cents, User_id ON Transactions
+                                   BEGIN {REMOVE_FROM_ROLLUPS} {ADD_TO_ROLLUPS} END;'''
+
+# List to contain all of the create trigger commands. Created once the tables have been migrated.
+TRIGGERS = [
+    CREATE_ROLLUP_INSERT_TRIGGER,
+    CREATE_ROLLUP_DELETE_TRIGGER,
+    CREATE_ROLLUP_UPDATE_TRIGGER
+]
+
+# Columns that identify a receipt or transaction, in the order they are hashed into the row's 'Fingerprint'.
+APPLE_FINGERPRINT_COLUMNS = ("Transaction_Date", "Clearing_Date", "Description", "Merchant", "Category", "Type",
+                             "Amount")
+ESL_FINGERPRINT_COLUMNS = ("Transaction_Number", "Date", "Description", "Memo", "Amount_Debit", "Amount_Credit",
+                           "Balance", "Check_Number", "Fees")
+TRANSACTION_FINGERPRINT_COLUMNS = ("Date", "Amount", "Card_Type", "Merchant", "Description")
+
+# Commands used to create the unique deduplication index of each receipt/transaction table
+CREATE_APPLE_FINGERPRINT_INDEX = '''CREATE UNIQUE INDEX IF NOT EXISTS AppleReceipts_Fingerprint
+                                    ON AppleReceipts(User_id, Fingerprint);'''
+CREATE_ESL_FINGERPRINT_INDEX = '''CREATE UNIQUE INDEX IF NOT EXISTS ESLReceipts_Fingerprint
+                                  ON ESLReceipts(User_id, Fingerprint);'''
+CREATE_TRANSACTIONS_FINGERPRINT_INDEX = '''CREATE UNIQUE INDEX IF NOT EXISTS Transactions_Fingerprint
+                                           ON Transactions(User_id, Fingerprint);'''
+
+# Commands used to create the covering indexes that serve the date-range and merchant reports.
+# Date ranges are searched by 'Day_Number', the number of days since 1970-01-01, so that they are integer comparisons.
+CREATE_TRANSACTIONS_DAY_INDEX = '''CREATE INDEX IF NOT EXISTS Transactions_User_Day
+                                   ON Transactions(User_id, Day_Number, Amount_Cents, Card_Type, Merchant);'''
+CREATE_TRANSACTIONS_MERCHANT_INDEX = '''CREATE INDEX IF NOT EXISTS Transactions_User_Merchant_Day
+                                        ON Transactions(User_id, Merchant, Day_Number, Amount_Cents);'''
+
+# Command used to create the index that keeps a single row per currency
+CREATE_CURRENCY_ACRONYM_INDEX = '''CREATE UNIQUE INDEX IF NOT EXISTS Currencies_Acronym
+                                   ON Currencies(Acronym);'''
+
+# List to contain all of the create index commands. Created once the tables have been migrated.
+INDEXES = [
+    CREATE_APPLE_FINGERPRINT_INDEX,
+    CREATE_ESL_FINGERPRINT_INDEX,
+    CREATE_TRANSACTIONS_FINGERPRINT_INDEX,
+    CREATE_TRANSACTIONS_DAY_INDEX,
+    CREATE_TRANSACTIONS_MERCHANT_INDEX,
+    CREATE_CURRENCY_ACRONYM_INDEX
+]
+
+# Queries used by the reports. Dates are bound as parameters in the YYYY-MM-DD format, and are compared against the
+# text keys of the spending rollups as they are.
+# The earliest and latest dates are converted back from the day numbers, which are read from the day index alone.
+SELECT_TOTAL_BETWEEN_DATES = '''SELECT SUM(Total_Cents)
+                                FROM DailySpend
+                                WHERE User_id=? AND Day BETWEEN ? AND ?;'''
+SELECT_AVERAGE_BETWEEN_DATES = '''SELECT SUM(Total_Cents) * 1.0 / SUM(Count)
+                                  FROM DailySpend
+                                  WHERE User_id=? AND Day BETWEEN ? AND ?;'''
+SELECT_EARLIEST_DATE = '''SELECT date(MIN(Day_Number) * 86400, 'unixepoch')
+                          FROM Transactions
+                          WHERE User_id=?;'''
+SELECT_LATEST_DATE = '''SELECT date(MAX(Day_Number) * 86400, 'unixepoch')
+                        FROM Transactions
+                        WHERE User_id=?;'''
+SELECT_YEAR_COUNTS = '''SELECT Year, Count
+                        FROM YearlySpend
+                        WHERE User_id=?
+                        ORDER BY Year;'''
+
+# Command used to bulk insert rows into the 'AppleReceipts' table, skipping receipts that already exist
+INSERT_APPLE_RECEIPTS = '''INSERT INTO AppleReceipts(Transaction_Date, Clearing_Date, Description, Merchant,
+                                                     Category, Type, Amount, Card_Type, Is_Payment,
+                                                     Is_Transaction, User_id, Fingerprint, Amount_Cents)
+                           VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?)
+                           ON CONFLICT DO NOTHING;'''
+
+# Command used to bulk insert rows into the 'ESLReceipts' table, skipping receipts that already exist
+INSERT_ESL_RECEIPTS = '''INSERT INTO ESLReceipts(Transaction_Number, Date, Description, Memo,
+                                                 Amount_Debit, Amount_Credit, Balance, Check_Number,
+                                                 Fees, Card_Type, Is_Payment, Is_Transaction, User_id, Fingerprint,
+                                                 Amount_Debit_Cents, Amount_Credit_Cents, Balance_Cents)
+                         VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+                         ON CONFLICT DO NOTHING;'''
+
+# Command used to bulk insert rows into the 'Transactions' table, skipping transactions that already exist
+INSERT_TRANSACTIONS = '''INSERT INTO Transactions(Date, Amount, Card_Type, Merchant, Description, User_id,
+                                                  Fingerprint, Amount_Cents, Day_Number)
+                         VALUES(?,?,?,?,?,?,?,?,?)
+                         ON CONFLICT DO NOTHING;'''
+
+# Command used to bulk insert rows into the 'Currencies' table, updating currencies whose name or symbol changed
+UPSERT_CURRENCIES = '''INSERT INTO Currencies(Acronym, Name, Symbol)
+                       VALUES(?,?,?)
+                       ON CONFLICT(Acronym) DO UPDATE SET Name=excluded.Name,
+                                                          Symbol=excluded.Symbol
+                       WHERE Name IS NOT excluded.Name OR Symbol IS NOT excluded.Symbol;'''
+
+# Commands used to read and write a value of the 'Metadata' table
+SELECT_METADATA = '''SELECT Value
+                     FROM Metadata
+                     WHERE Key=?;'''
+UPSERT_METADATA = '''INSERT INTO Metadata(Key, Value)
+                     VALUES(?,?)
+                     ON CONFLICT(Key) DO UPDATE SET Value=excluded.Value;'''
+
+# The 'Metadata' key holding the hash of the currencies file last inserted into the database
+CURRENCIES_HASH = "currencies_hash"
+
+# Commands used to retrieve every transaction up to a day, and the transactions between two days.
+# Days are bound as day numbers.
+SELECT_ALL_TRANSACTIONS = '''SELECT *
+                             FROM Transactions
+                             WHERE Day_Number BETWEEN 0 AND ?
+                             ORDER BY Day_Number;'''
+SELECT_TRANSACTIONS_BETWEEN_DATES = '''SELECT *
+                                       FROM Transactions
+                                       WHERE Day_Number BETWEEN ? AND ?;'''
+
+# Dictionary to contain the name of a parameterized statement as a Key, and the statement as the value.
+# Statements are run by name through the query registry (see objects/interface/dbconn.py), which records how often
+# each one runs and how long it takes. Since the text of each statement never changes, sqlite3 reuses its prepared
+# statement on every connection.
+QUERIES = {
+    "SELECT_TOTAL_BETWEEN_DATES": SELECT_TOTAL_BETWEEN_DATES,
+    "SELECT_AVERAGE_BETWEEN_DATES": SELECT_AVERAGE_BETWEEN_DATES,
+    "SELECT_EARLIEST_DATE": SELECT_EARLIEST_DATE,
+    "SELECT_LATEST_DATE": SELECT_LATEST_DATE,
+    "SELECT_YEAR_COUNTS": SELECT_YEAR_COUNTS,
+    "SELECT_ALL_TRANSACTIONS": SELECT_ALL_TRANSACTIONS,
+    "SELECT_TRANSACTIONS_BETWEEN_DATES": SELECT_TRANSACTIONS_BETWEEN_DATES,
+    "INSERT_APPLE_RECEIPTS": INSERT_APPLE_RECEIPTS,
+    "INSERT_ESL_RECEIPTS": INSERT_ESL_RECEIPTS,
+    "INSERT_TRANSACTIONS": INSERT_TRANSACTIONS,
+    "UPSERT_CURRENCIES": UPSERT_CURRENCIES,
+    "SELECT_METADATA": SELECT_METADATA,
+    "UPSERT_METADATA": UPSERT_METADATA
+}
+
+# The number of prepared statements sqlite3 keeps per connection. Large enough to hold every registered statement.
+STATEMENT_CACHE_SIZE = 256
+
+# The upper bounds, in milliseconds, of the buckets of the query latency histograms. The last bucket is unbounded.
+LATENCY_BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500)
+
 # List to contain the supported account types
 ACCOUNTS = [
     "Apple",
@@ -0,0 +1,39 @@
+import hashlib
+
+# Separator placed between each value so that ('ab', 'c') and ('a', 'bc') never share a fingerprint.
+FIELD_SEPARATOR = "\x1f"
+
+
+def normalize_value(value) -> str:
+    """
+    Normalize a single column value so the same receipt always produces the same text.
+    :param value: The value to normalize.
+    :return: The normalized string representation of the value.
+    """
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def fingerprint(values: tuple) -> str:
+    """
+    Create a stable fingerprint of a row, used as its deduplication key.
+    :param values: The column values that identify the row.
+    :return: The hex digest of the normalized row.
+    """
+    row = FIELD_SEPARATOR.join(normalize_value(value) for value in values)
+    return hashlib.sha1(row.encode('utf-8')).hexdigest()
+
+
+def file_hash(path: str, chunk_size: int = 1 << 16) -> str:
+    """
+    Hash the contents of a file without reading the whole file into memory.
+    :param path: The file to hash.
+    :param chunk_size: The number of bytes to read at a time.
+    :return: The hex digest of the file's contents.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
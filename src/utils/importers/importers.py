@@ -0,0 +1,122 @@
+import csv
+import re
+from itertools import islice
+from objects.accounts.Apple import APPLE_COLUMNS, build_apple_rows
+from objects.accounts.ESL import ESL_COLUMNS, build_esl_rows
+from utils.logger.logger import log
+from utils.streaming.streaming import read_rows
+
+
+class Importer:
+    """
+    Describes how the exports of an account are recognized and converted into rows of the database.
+    """
+
+    def __init__(self, account: str, columns: tuple, header_rows: int, build_rows, insert_query: str,
+                 column_aliases: dict = None, column_patterns: dict = None) -> None:
+        """
+        Construct an Importer.
+        :param account: The name of the account, which is also the name of the user's folder holding its exports.
+        :param columns: The names of the columns the row converter expects, in the order it expects them.
+        :param header_rows: The number of rows found at the top of an export before the first receipt. The last of
+                            these rows holds the names of the columns.
+        :param build_rows: The function converting a batch of csv rows into a tuple containing the receipt rows and
+                           the transaction rows to insert.
+        :param insert_query: The name of the command within the query registry used to insert the receipt rows.
+        :param column_aliases: Optional dictionary mapping other names used for a column to its name within 'columns'.
+        :param column_patterns: Optional dictionary mapping a regular expression matching the names used for a column,
+                                such as names that vary with the currency of the export, to its name within 'columns'.
+        """
+        self.account = account
+        self.columns = columns
+        self.header_rows = header_rows
+        self.build_rows = build_rows
+        self.insert_query = insert_query
+        self.column_aliases = column_aliases or {}
+        self.column_patterns = {re.compile(pattern): column for pattern, column in (column_patterns or {}).items()}
+
+    def get_column_name(self, name: str) -> str:
+        """
+        Translate the name of a column within a file into its name within 'columns'.
+        :param name: The name of the column within the file.
+        :return: The name of the column within 'columns', or the name itself if it is not an alias of a column.
+        """
+        if name in self.column_aliases:
+            return self.column_aliases[name]
+        for pattern, column in self.column_patterns.items():
+            if pattern.fullmatch(name):
+                return column
+        return name
+
+    def get_column_indexes(self, head: list):
+        """
+        Match the header of a file against the columns of this importer.
+        :param head: The first rows of the file.
+        :return: A tuple containing the position of each of this importer's columns within the file, or None if the
+                 file is not an export of this account.
+        """
+        if len(head) < self.header_rows:
+            return None
+
+        # Exports saved by spreadsheet applications may begin with a byte order mark.
+        header = [name.replace('\ufeff', '').strip() for name in head[self.header_rows - 1]]
+        header = [self.get_column_name(name) for name in header]
+        if not all(column in header for column in self.columns):
+            return None
+        return tuple(header.index(column) for column in self.columns)
+
+
+# The registered importers, keyed by account.
+IMPORTERS = {}
+
+
+def register_importer(importer: Importer) -> None:
+    """
+    Register an importer, so that exports matching its header are inserted with it.
+    :param importer: The importer to register.
+    """
+    IMPORTERS[importer.account] = importer
+
+
+def detect_importer(file: str):
+    """
+    Determine which importer a file should be inserted with, reading only the first few rows of the file.
+    :param file: The csv file to inspect.
+    :return: A tuple containing the importer and the position of each of its columns within the file, or
+             (None, None) if the file is not a supported export.
+    """
+    header_rows = max(importer.header_rows for importer in IMPORTERS.values())
+    rows = read_rows(file)
+    try:
+        head = list(islice(rows, header_rows))
+    except (UnicodeDecodeError, csv.Error):
+        head = []
+    finally:
+        rows.close()
+
+    for importer in IMPORTERS.values():
+        column_indexes = importer.get_column_indexes(head)
+        if column_indexes is not None:
+            return importer, column_indexes
+
+    log(f"'{file}' does not match the header of any supported export.", level="warning")
+    return None, None
+
+
+# The number of rows found at the top of each export before the first receipt.
+APPLE_HEADER_ROWS = 1
+ESL_HEADER_ROWS = 4
+
+register_importer(Importer(account="Apple",
+                           columns=APPLE_COLUMNS,
+                           header_rows=APPLE_HEADER_ROWS,
+                           build_rows=build_apple_rows,
+                           insert_query="INSERT_APPLE_RECEIPTS",
+                           column_aliases={"Transaction": "Transaction Date"},
+                           column_patterns={r"Amount \(\w+\)": "Amount (USD)"}))
+
+register_importer(Importer(account="ESL",
+                           columns=ESL_COLUMNS,
+                           header_rows=ESL_HEADER_ROWS,
+                           build_rows=build_esl_rows,
+                           insert_query="INSERT_ESL_RECEIPTS"))
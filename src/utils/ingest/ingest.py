@@ -0,0 +1,134 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import groupby
+from utils.cache.cache import invalidate_transaction_cache
+from objects.files.File import File
+from objects.interface.dbconn import DB
+import utils.globals as _globals
+from utils.logger.logger import log
+from utils.importers.importers import detect_importer
+from utils.streaming.streaming import read_rows, skip_rows, skip_blank_rows, select_columns, batched, parallel_map
+
+# The number of receipts parsed and written to the database at a time.
+BATCH_SIZE = 1000
+
+# The number of batches each worker process may have queued when parsing in parallel.
+BATCHES_PER_WORKER = 2
+
+
+def read_batches(db: DB, files: list, user_id: int):
+    """
+    Lazily read the csv rows of every file that needs to be inserted, in batches of BATCH_SIZE rows.
+    Files that are unchanged since they were last inserted are skipped without being read, and files that don't
+    match the header of a registered importer are skipped after reading their first few rows.
+    :param db: The database connection.
+    :param files: The list of csv files to read.
+    :param user_id: The id of the current user.
+    :return: A generator of tuples containing the file's manifest, its insert command, its row builder and a batch
+             of rows. Empty files produce a single empty batch so that they are still recorded in the manifest.
+    """
+    for file in files:
+        manifest = File(db, file, user_id)
+        if manifest.is_unchanged():
+            log(f"User:{user_id} skipped unchanged file '{file}'.", level="debug")
+            continue
+
+        # Only files that are new or have changed are opened to find their importer.
+        importer, column_indexes = detect_importer(file)
+        if importer is None:
+            continue
+
+        rows = skip_blank_rows(skip_rows(read_rows(file), importer.header_rows))
+        if column_indexes != tuple(range(len(column_indexes))):
+            rows = select_columns(rows, column_indexes)
+
+        file_is_empty = True
+        for batch in batched(rows, BATCH_SIZE):
+            file_is_empty = False
+            yield manifest, importer.insert_query, importer.build_rows, batch
+        if file_is_empty:
+            yield manifest, importer.insert_query, importer.build_rows, []
+
+
+def write_batches(db: DB, batches, user_id: int) -> int:
+    """
+    Write parsed batches into the database, using one transaction per file.
+    The file is only recorded in the manifest if its rows are committed along with it.
+    :param db: The database connection.
+    :param batches: Tuples containing a file's manifest, its insert command, and a parsed batch of its rows, ordered
+                    by file.
+    :param user_id: The id of the current user.
+    :return: The number of receipts inserted.
+    """
+    inserted = 0
+    for path, file_batches in groupby(batches, key=lambda batch: batch[0].path):
+        inserted_receipts = 0
+        inserted_transactions = 0
+        row_count = 0
+
+        with db.transaction():
+            for manifest, insert_query, (receipt_rows, transaction_rows) in file_batches:
+                inserted_receipts += db.execute_many_named(insert_query, receipt_rows)
+                inserted_transactions += db.execute_many_named("INSERT_TRANSACTIONS", transaction_rows)
+                row_count += len(receipt_rows)
+
+            manifest.row_count = row_count
+            manifest.insert_to_db()
+
+        log(f"User:{user_id} inserted {inserted_receipts} receipts and {inserted_transactions} transactions "
+            f"from '{path}'.", level="debug")
+        inserted += inserted_receipts
+    return inserted
+
+
+def parse_batches(db: DB, files: list, user_id: int, executor: ProcessPoolExecutor = None, workers: int = 1):
+    """
+    Parse the batches of every file that needs to be inserted, keeping them in the order they were read.
+    :param db: The database connection.
+    :param files: The list of csv files to parse.
+    :param user_id: The id of the current user.
+    :param executor: Optional pool of worker processes to parse the batches with.
+    :param workers: The number of worker processes within the executor.
+    :return: A generator of tuples containing a file's manifest, its insert command, and a parsed batch of its rows.
+    """
+    batches = read_batches(db, files, user_id)
+    if executor is None:
+        for manifest, insert_query, build_rows, rows in batches:
+            yield manifest, insert_query, build_rows(rows, user_id)
+    else:
+        # Only the rows are sent to the workers; the manifest and insert command stay with the writer.
+        tasks = (((manifest, insert_query), build_rows, (rows, user_id))
+                 for manifest, insert_query, build_rows, rows in batches)
+        for (manifest, insert_query), parsed in parallel_map(executor, tasks, window=workers * BATCHES_PER_WORKER):
+            yield manifest, insert_query, parsed
+
+
+def ingest_files(db: DB, files: list, user_id: int, single_transaction: bool = False, workers: int = None) -> bool:
+    """
+    Insert a list of files into the database, using one transaction per file.
+    With more than one worker, the rows are parsed by a pool of worker processes while this process remains the only
+    writer to the database. Batches are written in the order they were read, so the result is identical to
+    inserting the files sequentially.
+    :param db: The database connection.
+    :param files: The list of csv files to insert.
+    :param user_id: The id of the current user.
+    :param single_transaction: Boolean to determine whether the whole upload should be committed as one transaction
+                               instead of once per file.
+    :param workers: The number of worker processes used to parse the files. Defaults to INGEST_WORKERS.
+    :return: True if any new data was inserted. False otherwise.
+    """
+    workers = _globals.INGEST_WORKERS if workers is None else workers
+
+    with db.profile(_globals.INGEST_DATABASE_PROFILE):
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                with db.transaction() if single_transaction else nullcontext():
+                    inserted = write_batches(db, parse_batches(db, files, user_id, executor, workers), user_id)
+        else:
+            with db.transaction() if single_transaction else nullcontext():
+                inserted = write_batches(db, parse_batches(db, files, user_id), user_id)
+
+    if inserted > 0:
+        invalidate_transaction_cache(user_id)
+
+    return inserted > 0
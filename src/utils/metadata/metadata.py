@@ -0,0 +1,22 @@
+from objects.interface.dbconn import DB
+
+
+def get_metadata(db: DB, key: str):
+    """
+    Retrieve a value of the database's metadata.
+    :param db: The database connection.
+    :param key: The key of the value.
+    :return: The value, or None if it has not been set.
+    """
+    rows = db.fetch_named("SELECT_METADATA", values=(key,))
+    return rows[0][0] if len(rows) > 0 else None
+
+
+def set_metadata(db: DB, key: str, value: str) -> None:
+    """
+    Set a value of the database's metadata, replacing the previous value of the key.
+    :param db: The database connection.
+    :param key: The key of the value.
+    :param value: The value to set.
+    """
+    db.commit_named("UPSERT_METADATA", values=(key, value))
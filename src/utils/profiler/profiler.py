@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from time import perf_counter
+from utils.logger.logger import log
+from utils.print import print_error
+
+
+class StartupProfiler:
+    """
+    Records how long each phase of the application's startup takes, and reports them once startup has finished.
+    """
+
+    def __init__(self, enabled: bool = False, started: float = None) -> None:
+        """
+        Construct a Startup Profiler.
+        :param enabled: Boolean to determine whether the phases are reported.
+        :param started: The perf_counter() value at which startup began. Defaults to now.
+        """
+        self.enabled = enabled
+        self.started = perf_counter() if started is None else started
+        self.phases = []
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record a phase that has already been timed.
+        :param name: The name of the phase.
+        :param seconds: The number of seconds the phase took.
+        """
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Time the phase run within the 'with' block.
+        :param name: The name of the phase.
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def report(self) -> None:
+        """
+        Print and log the time taken by each phase, along with the total time since startup began.
+        The profile is written to stderr, so that it never mixes with results written to stdout (e.g. batch reports).
+        """
+        if not self.enabled:
+            return
+
+        width = max(len(name) for name, _ in self.phases + [("total", 0)])
+        lines = [f"{name:<{width}}  {seconds * 1000:9.1f} ms" for name, seconds in self.phases]
+        lines.append(f"{'total':<{width}}  {(perf_counter() - self.started) * 1000:9.1f} ms")
+
+        print_error("Startup profile:")
+        for line in lines:
+            print_error(f"  {line}")
+            log(f"Startup profile: {line}", level="info")
@@ -0,0 +1,174 @@
+import csv
+import json
+from datetime import datetime
+from objects.user.User import User
+from utils.aggregator.aggregator import aggregate
+from utils.averager.averager import calculate_average
+from utils.dates.dates import get_dates
+from utils.enums import Buckets, Reports, is_valid_month, month_string_to_enum
+from utils.exceptions import InvalidMonth, InvalidReport, NoDataFound, UserNotFound
+from utils.formatting.formatter import format_cents_to_amount
+from utils.logger.logger import log
+from utils.user.user_helper import get_user
+
+# Dictionary to contain the name of a report as a Key, and the bucket its totals are grouped by as the value.
+REPORT_BUCKETS = {
+    Reports.DAILY.name: Buckets.DAY,
+    Reports.MONTHLY.name: Buckets.MONTH,
+    Reports.YEARLY.name: Buckets.YEAR,
+    Reports.MERCHANTS.name: Buckets.MERCHANT,
+}
+
+# The columns of the csv output. Each total of a report is written on its own row.
+CSV_COLUMNS = ["user", "report", "start", "end", "key", "value", "error"]
+
+
+def load_report_specs(file) -> list:
+    """
+    Read the report specifications to run from a json file.
+    A specification is an object such as {"report": "monthly", "year": "2020", "user": "username"}, where:
+        'report' is one of 'daily', 'monthly', 'yearly', 'merchants' or 'average'.
+        The dates are given by 'start' and 'end' (YYYY-MM-DD), by 'month' and 'year', or by 'year' alone, and
+        default to all time.
+        'user' is optional, and defaults to the signed in user.
+    :param file: The open json file.
+    :raises InvalidReport: Exception raised when the file does not contain a list of specifications.
+    :return: The list of specifications.
+    """
+    specs = json.load(file)
+    if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+        raise InvalidReport("expected a list of report objects")
+    return specs
+
+
+def is_valid_date(date: str) -> bool:
+    """
+    Determine if a date is in the YYYY-MM-DD format.
+    :param date: The date to check.
+    :return: True if the date is valid, False otherwise.
+    """
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def get_report_dates(user: User, spec: dict) -> (str, str):
+    """
+    Determine the dates a report covers.
+    :param user: The user the report is for.
+    :param spec: The report specification.
+    :raises InvalidReport: Exception raised when the dates of the specification are invalid.
+    :raises InvalidMonth: Exception raised when the month of the specification is invalid.
+    :raises NoDataFound: Exception raised when an all time report is requested for a user without transactions.
+    :return: The starting and ending dates of the report.
+    """
+    if "start" in spec or "end" in spec:
+        start, end = spec.get("start"), spec.get("end")
+        if not (is_valid_date(start) and is_valid_date(end)):
+            raise InvalidReport(f"'start' and 'end' must both be YYYY-MM-DD dates, not {start} and {end}")
+        return start, end
+
+    year = str(spec.get("year", ""))
+    if "month" in spec or "year" in spec:
+        if not (year.isdigit() and len(year) == 4):
+            raise InvalidReport(f"'{year}' is not a year")
+
+    if "month" in spec:
+        month = month_string_to_enum(str(spec["month"]))
+        if not is_valid_month(month):
+            raise InvalidMonth(str(spec["month"]))
+        return get_dates(month, year)
+
+    if "year" in spec:
+        return f"{year}-01-01", f"{year}-12-31"
+
+    return user.get_earliest_transaction_date(), user.get_latest_transaction_date()
+
+
+def run_report(user: User, spec: dict) -> dict:
+    """
+    Run a single report.
+    :param user: The user the report is for.
+    :param spec: The report specification.
+    :raises InvalidReport: Exception raised when the specification is invalid.
+    :raises InvalidMonth: Exception raised when the month of the specification is invalid.
+    :raises NoDataFound: Exception raised when the user has no transactions between the dates.
+    :return: A dictionary containing the user, report and dates, along with either the 'average', or the 'totals'
+             per bucket and their overall 'total'.
+    """
+    report = str(spec.get("report", "")).upper()
+    if report != Reports.AVERAGE.name and report not in REPORT_BUCKETS:
+        raise InvalidReport(f"unknown report '{spec.get('report')}'")
+
+    start, end = get_report_dates(user, spec)
+    result = {"user": user.username, "report": report.lower(), "start": start, "end": end}
+
+    if report == Reports.AVERAGE.name:
+        result["average"] = calculate_average(start_date=start, end_date=end, user_id=user.id)
+        return result
+
+    totals = aggregate(user.id, REPORT_BUCKETS[report], (start, end))
+    if len(totals) == 0:
+        raise NoDataFound(f"{start} - {end}")
+    result["totals"] = {key: format_cents_to_amount(cents) for key, cents in totals.items()}
+    result["total"] = format_cents_to_amount(sum(totals.values()))
+    return result
+
+
+def run_reports(specs: list, default_user: User = None) -> list:
+    """
+    Run every report within a single process, sharing the database connection and each user's transaction cache.
+    Reports that cannot be run are included within the results with an 'error' rather than stopping the batch.
+    :param specs: The list of report specifications.
+    :param default_user: The user of the specifications that do not name a user.
+    :return: The list of results, in the order of the specifications.
+    """
+    users = {} if default_user is None else {default_user.username: default_user}
+    results = []
+
+    for spec in specs:
+        username = spec.get("user", default_user.username if default_user is not None else None)
+        try:
+            if username is None:
+                raise InvalidReport("no 'user' was given and no user is signed in")
+            if username not in users:
+                users[username] = get_user(username)
+            results.append(run_report(users[username], spec))
+        except (InvalidReport, InvalidMonth, NoDataFound, UserNotFound) as e:
+            log(e.message, level="warning")
+            results.append({"user": username, "report": spec.get("report"), "error": e.message})
+
+    log(f"Ran {len(results)} batch reports for {len(users)} users.", level="info")
+    return results
+
+
+def write_reports_json(results: list, file) -> None:
+    """
+    Write the results of a batch of reports as json.
+    :param results: The results of run_reports().
+    :param file: The open file to write to.
+    """
+    json.dump(results, file, indent=2)
+    file.write("\n")
+
+
+def write_reports_csv(results: list, file) -> None:
+    """
+    Write the results of a batch of reports as csv, with one row per total.
+    :param results: The results of run_reports().
+    :param file: The open file to write to.
+    """
+    writer = csv.DictWriter(file, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+    writer.writeheader()
+
+    for result in results:
+        if "error" in result:
+            writer.writerow(result)
+        elif "average" in result:
+            writer.writerow(dict(result, key="average", value=result["average"]))
+        else:
+            for key, value in result["totals"].items():
+                writer.writerow(dict(result, key=key, value=value))
+            writer.writerow(dict(result, key="total", value=result["total"]))
@@ -1,30 +1,34 @@
-import csv
 import utils.globals as _globals
 from objects.interface.dbconn import DB
-from objects.user.Currency import Currency
+from objects.user.Currency import invalidate_currencies
+from utils.hashing.hashing import file_hash
 from utils.logger.logger import log
+from utils.metadata.metadata import get_metadata, set_metadata
+from utils.streaming.streaming import read_rows, skip_rows, skip_blank_rows
 
 
 def startup() -> None:
     """
     Insert all of the available currencies into the database.
+    The currencies file is only read when its hash differs from the hash recorded by the last startup, in which case
+    every currency is upserted within a single transaction.
     """
     db = DB(_globals.DATABASE)
-    db_updated = False
     file = _globals.CURRENCIES
+    currencies_hash = file_hash(file)
 
-    with open(file, newline='', encoding='utf-8') as csvf:
-        rows = list(csv.reader(csvf))
-        for i in range(1, len(rows)):
-            currency = Currency(db, rows[i])
+    if get_metadata(db, _globals.CURRENCIES_HASH) == currencies_hash:
+        log("No new currencies added to the database.", level="debug")
+        db.close()
+        return
 
-            if not currency.exists_in_db():
-                currency.insert_to_db()
-                db_updated = True
+    # Skip the header row of the file.
+    currencies = [tuple(row[:3]) for row in skip_blank_rows(skip_rows(read_rows(file, encoding='utf-8'), 1))]
 
-    if db_updated:
-        log("New currencies have been added to the database.", level="debug")
-    else:
-        log("No new currencies added to the database.", level="debug")
+    with db.transaction():
+        updated = db.execute_many_named("UPSERT_CURRENCIES", currencies)
+        set_metadata(db, _globals.CURRENCIES_HASH, currencies_hash)
+    invalidate_currencies()
 
+    log(f"{updated} currencies have been added to or updated within the database.", level="debug")
     db.close()
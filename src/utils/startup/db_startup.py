@@ -1,5 +1,6 @@
 from objects.interface.dbconn import DB
 import utils.globals as _globals
+from utils.startup.migrations import migrate
 from utils.logger.logger import log
 
 
@@ -10,4 +11,10 @@ def startup() -> None:
     log("Initializing the database...", level="debug")
     db = DB(_globals.DATABASE)
     db.setup_tables()
+    migrate(db)
+    db.setup_indexes()
+    db.setup_triggers()
+
+    # Refresh the statistics the query planner uses to choose between the indexes.
+    db.commit("PRAGMA optimize;")
     db.close()
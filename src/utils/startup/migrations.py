@@ -0,0 +1,181 @@
+from objects.interface.dbconn import DB
+import utils.globals as _globals
+from utils.aggregator.rollups import rebuild_rollups
+from utils.formatting.formatter import format_amount_to_cents, format_date_to_day_number
+from utils.hashing.hashing import fingerprint
+from utils.logger.logger import log
+
+
+def column_exists(db: DB, table: str, column: str) -> bool:
+    """
+    Determine if a column exists within a table.
+    :param db: The database connection.
+    :param table: The table to check.
+    :param column: The name of the column.
+    :return: True if the column exists, False otherwise.
+    """
+    return any(info[1] == column for info in db.fetchall(f"PRAGMA table_info({table});"))
+
+
+def add_column(db: DB, table: str, column: str, declaration: str) -> None:
+    """
+    Add a column to a table if the table does not already contain it.
+    :param db: The database connection.
+    :param table: The table to alter.
+    :param column: The name of the column.
+    :param declaration: The type (and constraints) of the column.
+    """
+    if not column_exists(db, table, column):
+        db.commit(f"ALTER TABLE {table} ADD COLUMN {column} {declaration};")
+        log(f"Column '{column}' has been added to '{table}'.", level="info")
+
+
+def backfill_fingerprints(db: DB, table: str, columns: tuple) -> None:
+    """
+    Compute the fingerprint of every row that is missing one, then remove the rows that share a fingerprint with an
+    older row of the same user so that the unique fingerprint index can be created.
+    :param db: The database connection.
+    :param table: The table to backfill.
+    :param columns: The columns hashed into the fingerprint.
+    """
+    rows = db.fetchall(f"SELECT id, {', '.join(columns)} FROM {table} WHERE Fingerprint IS NULL;")
+    if len(rows) == 0:
+        return
+
+    with db.transaction():
+        db.execute_many(f"UPDATE {table} SET Fingerprint=? WHERE id=?;",
+                        [(fingerprint(row[1:]), row[0]) for row in rows])
+        db.commit(f"""DELETE
+                      FROM {table}
+                      WHERE id NOT IN (SELECT MIN(id) FROM {table} GROUP BY User_id, Fingerprint);""")
+    log(f"Backfilled {len(rows)} fingerprints within '{table}'.", level="info")
+
+
+def add_fingerprints(db: DB) -> None:
+    """
+    Migration #1: add the 'Fingerprint' deduplication key to the receipt and transaction tables.
+    """
+    for table, columns in (('AppleReceipts', _globals.APPLE_FINGERPRINT_COLUMNS),
+                           ('ESLReceipts', _globals.ESL_FINGERPRINT_COLUMNS),
+                           ('Transactions', _globals.TRANSACTION_FINGERPRINT_COLUMNS)):
+        add_column(db, table, 'Fingerprint', 'text')
+        backfill_fingerprints(db, table, columns)
+
+
+def backfill_cents(db: DB, table: str, columns: dict) -> None:
+    """
+    Convert the text amounts of every row into their integer-cents counterpart.
+    :param db: The database connection.
+    :param table: The table to backfill.
+    :param columns: Dictionary containing the text columns as keys, and their cents column as the value.
+    """
+    text_columns = list(columns.keys())
+    cents_columns = list(columns.values())
+    rows = db.fetchall(f"SELECT id, {', '.join(text_columns)} FROM {table} "
+                       f"WHERE {' AND '.join(column + ' IS NULL' for column in cents_columns)};")
+    if len(rows) == 0:
+        return
+
+    with db.transaction():
+        db.execute_many(f"UPDATE {table} SET {', '.join(column + '=?' for column in cents_columns)} WHERE id=?;",
+                        [tuple(format_amount_to_cents(amount) for amount in row[1:]) + (row[0],) for row in rows])
+    log(f"Backfilled {len(rows)} integer-cents amounts within '{table}'.", level="info")
+
+
+def add_integer_cents(db: DB) -> None:
+    """
+    Migration #2: store every monetary amount as an integer number of cents alongside its original text.
+    """
+    for table, columns in (('AppleReceipts', {'Amount': 'Amount_Cents'}),
+                           ('ESLReceipts', {'Amount_Debit': 'Amount_Debit_Cents',
+                                            'Amount_Credit': 'Amount_Credit_Cents',
+                                            'Balance': 'Balance_Cents'}),
+                           ('Transactions', {'Amount': 'Amount_Cents'})):
+        for column in columns.values():
+            add_column(db, table, column, 'integer')
+        backfill_cents(db, table, columns)
+
+
+def add_spending_rollups(db: DB) -> None:
+    """
+    Migration #3: populate the DailySpend, MonthlySpend and YearlySpend rollups from the existing transactions.
+    The rollups are now populated by migration #6, which applies within the same upgrade once the transactions have
+    their day numbers.
+    """
+    pass
+
+
+def deduplicate_currencies(db: DB) -> None:
+    """
+    Migration #4: keep a single row per currency acronym so that the currencies can be upserted. Users of a removed
+    duplicate are moved to the oldest row of the same acronym.
+    """
+    with db.transaction():
+        db.commit("""UPDATE Users
+                     SET Currency_id=(SELECT MIN(id)
+                                      FROM Currencies
+                                      WHERE Acronym=(SELECT Acronym FROM Currencies WHERE id=Users.Currency_id))
+                     WHERE Currency_id IN (SELECT id FROM Currencies);""")
+        db.commit("""DELETE
+                     FROM Currencies
+                     WHERE id NOT IN (SELECT MIN(id) FROM Currencies GROUP BY Acronym);""")
+
+
+def add_day_numbers(db: DB) -> None:
+    """
+    Migration #5: store the day number of every transaction so that date ranges are searched as integers, and drop
+    the indexes over the text dates that the day indexes replace.
+    """
+    add_column(db, 'Transactions', 'Day_Number', 'integer')
+    rows = db.fetchall("SELECT id, Date FROM Transactions WHERE Day_Number IS NULL;")
+
+    with db.transaction():
+        db.execute_many("UPDATE Transactions SET Day_Number=? WHERE id=?;",
+                        [(format_date_to_day_number(row[1]), row[0]) for row in rows])
+        db.commit("DROP INDEX IF EXISTS Transactions_User_Date;")
+        db.commit("DROP INDEX IF EXISTS Transactions_User_Merchant_Date;")
+    log(f"Backfilled {len(rows)} day numbers within 'Transactions'.", level="info")
+
+
+def exclude_undated_rollups(db: DB) -> None:
+    """
+    Migration #6: leave the transactions without a day number out of the spending rollups, as they are left out of the
+    transaction cache. The rollup triggers are dropped so that they are created again with the new definition.
+    """
+    for trigger in ('Transactions_Rollup_Insert', 'Transactions_Rollup_Delete', 'Transactions_Rollup_Update'):
+        db.commit(f"DROP TRIGGER IF EXISTS {trigger};")
+    rebuild_rollups(db)
+
+
+def drop_year_index(db: DB) -> None:
+    """
+    Migration #7: drop the index over the years of every user's transactions. Years are only listed per user, which
+    the primary key of the 'YearlySpend' table already serves.
+    """
+    db.commit("DROP INDEX IF EXISTS YearlySpend_Year;")
+
+
+# List to contain every migration, in the order they are applied.
+# The database's 'user_version' records how many of them have been applied.
+MIGRATIONS = [
+    add_fingerprints,
+    add_integer_cents,
+    add_spending_rollups,
+    deduplicate_currencies,
+    add_day_numbers,
+    exclude_undated_rollups,
+    drop_year_index
+]
+
+
+def migrate(db: DB) -> None:
+    """
+    Apply every migration that has not yet been applied to the database.
+    :param db: The database connection.
+    """
+    version = db.fetchall("PRAGMA user_version;")[0][0]
+
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        log(f"Applying database migration #{number}: {migration.__name__}.", level="info")
+        migration(db)
+        db.commit(f"PRAGMA user_version = {number};")
@@ -0,0 +1,80 @@
+import csv
+from collections import deque
+from itertools import islice
+
+
+def read_rows(file: str, encoding: str = None):
+    """
+    Lazily read the rows of a csv file, keeping only the current row in memory.
+    :param file: The csv file to read.
+    :param encoding: The encoding of the file, or None to use the platform's default.
+    :return: A generator of the rows within the file.
+    """
+    with open(file, newline='', encoding=encoding) as csv_file:
+        yield from csv.reader(csv_file)
+
+
+def skip_rows(rows, count: int):
+    """
+    Skip the rows found at the top of a file before its data, such as headers or an account preamble.
+    :param rows: The rows to read from.
+    :param count: The number of rows to skip.
+    :return: A generator of the remaining rows.
+    """
+    return islice(rows, count, None)
+
+
+def skip_blank_rows(rows):
+    """
+    Skip the empty rows within a file.
+    :param rows: The rows to read from.
+    :return: A generator of the rows containing data.
+    """
+    return (row for row in rows if row)
+
+
+def select_columns(rows, indexes: tuple):
+    """
+    Reorder the columns of each row.
+    :param rows: The rows to read from.
+    :param indexes: The position of each column to keep, in the order they should be returned.
+    :return: A generator of the reordered rows.
+    """
+    return ([row[index] for index in indexes] for row in rows)
+
+
+def batched(items, size: int):
+    """
+    Group items into lists of a fixed size, so they can be written to the database in chunks.
+    :param items: The items to group.
+    :param size: The number of items within each batch. The last batch may be smaller.
+    :return: A generator of lists containing at most 'size' items.
+    """
+    items = iter(items)
+    batch = list(islice(items, size))
+    while batch:
+        yield batch
+        batch = list(islice(items, size))
+
+
+def parallel_map(executor, tasks, window: int):
+    """
+    Run a series of tasks within a pool of workers, yielding the results in the order the tasks were given.
+    At most 'window' tasks are submitted at a time, so the tasks are still read lazily.
+    :param executor: The pool of workers to run the tasks within.
+    :param tasks: Tuples containing the context of a task, which is kept within this process, the function to run,
+                  and the arguments the function is called with. The function must be picklable when the executor is
+                  a process pool.
+    :param window: The maximum number of tasks submitted at a time.
+    :return: A generator of tuples containing the context of each task and the result of its function.
+    """
+    pending = deque()
+    for context, function, arguments in tasks:
+        pending.append((context, executor.submit(function, *arguments)))
+        if len(pending) >= window:
+            context, future = pending.popleft()
+            yield context, future.result()
+
+    while pending:
+        context, future = pending.popleft()
+        yield context, future.result()
@@ -1,7 +1,13 @@
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
+import hashlib
+import json
+import os
+import utils.globals as _globals
 from utils.enums import Charts
+from utils.logger.logger import log
+from utils.print import print_message
+
+# The plotting stack (matplotlib and numpy) is imported by the functions that draw, so that it is only loaded once a
+# visualization is requested rather than every time the application starts.
 
 
 def get_median(numbers: list) -> int:
@@ -10,7 +16,8 @@ def get_median(numbers: list) -> int:
     :param numbers: The list containing the numbers.
     :return: The median.
     """
-    numbers.sort()
+    # Sort a copy, since the numbers are still needed in their original order by the caller.
+    numbers = sorted(numbers)
     return numbers[len(numbers) // 2]
 
 
@@ -38,15 +45,20 @@ def get_exploding_values(list_of_values: list) -> tuple:
     return tuple(exploding_values)
 
 
-def set_up_bar_chart(title: str, list_of_values: list, list_of_labels: list, currency_labels: list) -> None:
+def set_up_bar_chart(fig, title: str, list_of_values: list, list_of_labels: list, currency_labels: list) -> None:
     """
     Configure the bar chart visualization.
+    :param fig: The figure to draw the chart on.
     :param title: The title to be displayed on the visualization.
     :param list_of_values: The list containing the values to plot.
     :param list_of_labels: The list containing the labels that correspond to the values.
     :param currency_labels: The list containing the currency labels.
     """
-    fig, ax1 = plt.subplots(figsize=(12, 7))  # Create the figure
+    import numpy as np
+    from matplotlib.ticker import MaxNLocator
+
+    fig.set_size_inches(12, 7)
+    ax1 = fig.subplots()
     fig.subplots_adjust(left=0.115, right=0.88)
 
     pos = np.arange(len(list_of_labels))
@@ -71,7 +83,7 @@ def set_up_bar_chart(title: str, list_of_values: list, list_of_labels: list, cur
 
     # title
     ax1.set_title(title)
-    fig.canvas.manager.set_window_title(title)
+    set_window_title(fig, title)
 
     # labels
     ax1.set_xlabel("Dollar Range")
@@ -82,17 +94,21 @@ def set_up_bar_chart(title: str, list_of_values: list, list_of_labels: list, cur
     ax2.set_ylabel("Total Spent", rotation=-90)
 
 
-def set_up_pie_chart(title: str, list_of_values: list, list_of_labels: list) -> None:
+def set_up_pie_chart(fig, title: str, list_of_values: list, list_of_labels: list) -> None:
     """
     Configure the pie chart visualization where the slices will be ordered and plotted counter-clockwise.
+    :param fig: The figure to draw the chart on.
     :param title: The title to be displayed on the visualization.
     :param list_of_values: The list containing the values to plot.
     :param list_of_labels: The list containing the labels that correspond to the values.
     """
+    import numpy as np
+
     explode = get_exploding_values(list_of_values)
     width = 12
     height = 9
-    fig, ax = plt.subplots(figsize=(width, height))
+    fig.set_size_inches(width, height)
+    ax = fig.subplots()
 
     np_values = np.array(list_of_values)
     np_labels = np.char.array(list_of_labels)
@@ -110,24 +126,36 @@ def set_up_pie_chart(title: str, list_of_values: list, list_of_labels: list) ->
 
     # title
     ax.set_title(title)
-    fig.canvas.manager.set_window_title(title)
+    set_window_title(fig, title)
 
-    plt.legend(patches, labels_to_display, loc='lower left', fontsize=8)
-    plt.tight_layout()
+    ax.legend(patches, labels_to_display, loc='lower left', fontsize=8)
+    fig.tight_layout()
 
 
-def display_visual(title: str, chart_type: Charts = Charts.BAR, list_of_values: list = None,
-                   list_of_labels: list = None, currency_labels: list = None) -> None:
+def set_window_title(fig, title: str) -> None:
     """
-    Display a visualization.
+    Set the title of the window a figure is displayed in. Figures rendered offscreen have no window.
+    :param fig: The figure.
+    :param title: The title of the window.
+    """
+    if fig.canvas.manager is not None:
+        fig.canvas.manager.set_window_title(title)
+
+
+def set_up_visual(fig, title: str, chart_type: Charts, list_of_values: list, list_of_labels: list,
+                  currency_labels: list) -> None:
+    """
+    Draw a visualization on a figure.
+    :param fig: The figure to draw the visualization on.
     :param title: The title to display at the top of the visualization.
-    :param chart_type: The type of chart to display.
+    :param chart_type: The type of chart to draw.
     :param list_of_values: List containing all of the necessary values to display information.
     :param list_of_labels: List containing all of the labels to display on the visualization.
     :param currency_labels: List containing labels of currency information to display.
     """
     if chart_type.name == Charts.BAR.name:
-        set_up_bar_chart(title=title,
+        set_up_bar_chart(fig,
+                         title=title,
                          list_of_values=list_of_values,
                          list_of_labels=list_of_labels,
                          currency_labels=currency_labels)
@@ -135,20 +163,132 @@ def display_visual(title: str, chart_type: Charts = Charts.BAR, list_of_values:
         # TODO
         pass
     elif chart_type.name == Charts.PIE.name:
-        set_up_pie_chart(title=title,
+        set_up_pie_chart(fig,
+                         title=title,
                          list_of_values=list_of_values,
                          list_of_labels=list_of_labels)
 
+
+def get_chart_key(title: str, chart_type: Charts, list_of_values: list, list_of_labels: list,
+                  currency_labels: list, image_format: str) -> str:
+    """
+    Create the key a rendered chart is cached under: the hash of everything the image depends on.
+    :param title: The title displayed at the top of the visualization.
+    :param chart_type: The type of chart.
+    :param list_of_values: List containing all of the values of the visualization.
+    :param list_of_labels: List containing all of the labels of the visualization.
+    :param currency_labels: List containing the currency labels of the visualization.
+    :param image_format: The format of the image.
+    :return: The hex digest identifying the chart.
+    """
+    contents = [_globals.CHART_STYLE_VERSION, chart_type.name, image_format, title,
+                list_of_values, list_of_labels, currency_labels]
+    return hashlib.sha1(json.dumps(contents, default=str).encode('utf-8')).hexdigest()
+
+
+def render_visual(title: str, chart_type: Charts = Charts.BAR, list_of_values: list = None,
+                  list_of_labels: list = None, currency_labels: list = None, image_format: str = 'png',
+                  folder: str = None) -> str:
+    """
+    Render a visualization to an image file without displaying it, using matplotlib's Agg canvas.
+    Charts are named after the hash of their data and style, so a chart that was already rendered is reused rather
+    than drawn again.
+    :param title: The title to display at the top of the visualization.
+    :param chart_type: The type of chart to render.
+    :param list_of_values: List containing all of the necessary values to display information.
+    :param list_of_labels: List containing all of the labels to display on the visualization.
+    :param currency_labels: List containing labels of currency information to display.
+    :param image_format: The format of the image, 'png' or 'svg'.
+    :param folder: The folder to render the chart to. Defaults to the 'Charts' folder.
+    :return: The path of the rendered chart.
+    """
+    folder = folder or _globals.CHARTS_FOLDER
+    key = get_chart_key(title, chart_type, list_of_values, list_of_labels, currency_labels, image_format)
+    path = os.path.join(folder, f"{key}.{image_format}")
+
+    if os.path.exists(path):
+        log(f"Reusing the rendered chart '{path}'.", level="debug")
+        return path
+
+    # A figure created without pyplot is not tracked by it, so it is freed as soon as it has been saved.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    set_up_visual(fig, title, chart_type, list_of_values, list_of_labels, currency_labels)
+
+    # Write to a temporary file first, so that an interrupted render never leaves a partial chart under its key.
+    os.makedirs(folder, exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(temporary_path, format=image_format)
+    os.replace(temporary_path, path)
+
+    log(f"Rendered the chart '{path}'.", level="debug")
+    return path
+
+
+def display_visual(title: str, chart_type: Charts = Charts.BAR, list_of_values: list = None,
+                   list_of_labels: list = None, currency_labels: list = None) -> None:
+    """
+    Display a visualization.
+    :param title: The title to display at the top of the visualization.
+    :param chart_type: The type of chart to display.
+    :param list_of_values: List containing all of the necessary values to display information.
+    :param list_of_labels: List containing all of the labels to display on the visualization.
+    :param currency_labels: List containing labels of currency information to display.
+    """
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure()
+    set_up_visual(fig, title, chart_type, list_of_values, list_of_labels, currency_labels)
     plt.show()
 
+    # Release the figure once its window is closed, so that memory does not grow with every chart.
+    plt.close(fig)
+
+
+def output_visual(title: str, chart_type: Charts, list_of_values: list, list_of_labels: list,
+                  currency_labels: list = None, image_format: str = None):
+    """
+    Display a visualization, or render it to a file when an image format is given or set through the
+    'RENDER_FORMAT' global.
+    :param title: The title to display at the top of the visualization.
+    :param chart_type: The type of chart.
+    :param list_of_values: List containing all of the necessary values to display information.
+    :param list_of_labels: List containing all of the labels to display on the visualization.
+    :param currency_labels: List containing labels of currency information to display.
+    :param image_format: The format of the image to render ('png' or 'svg').
+    :return: The path of the rendered chart, or None if the chart was displayed.
+    """
+    image_format = image_format or _globals.RENDER_FORMAT
+    if image_format is None:
+        display_visual(title=title,
+                       list_of_values=list_of_values,
+                       list_of_labels=list_of_labels,
+                       currency_labels=currency_labels,
+                       chart_type=chart_type)
+        return None
+
+    path = render_visual(title=title,
+                         list_of_values=list_of_values,
+                         list_of_labels=list_of_labels,
+                         currency_labels=currency_labels,
+                         chart_type=chart_type,
+                         image_format=image_format)
+    print_message(f"The chart has been saved to '{path}'.")
+    return path
+
 
-def display_pie_chart(title: str, merchants: dict) -> None:
+def display_pie_chart(title: str, merchants: dict, image_format: str = None):
     """
     TODO: This has yet to be used within the application.
     Display a Pie Chart that contains information about where the most money was spent over a period of time.
     :param title: The title to display at the top of the visualization.
     :param merchants: Dictionary containing merchant information.
                       Note: The form of the dictionary is: { MerchantName : TotalSpent }.
+    :param image_format: The format to render the chart to ('png' or 'svg') instead of displaying it.
+    :return: The path of the rendered chart, or None if the chart was displayed.
     """
     list_of_values = []
     list_of_labels = []
@@ -156,23 +296,27 @@ def display_pie_chart(title: str, merchants: dict) -> None:
         list_of_labels.append(key)
         list_of_values.append(merchants[key])
 
-    display_visual(title=title,
-                   list_of_values=list_of_values,
-                   list_of_labels=list_of_labels,
-                   chart_type=Charts.PIE
-                   )
+    return output_visual(title=title,
+                       list_of_values=list_of_values,
+                       list_of_labels=list_of_labels,
+                       chart_type=Charts.PIE,
+                       image_format=image_format)
 
 
-def display_bar_chart(title: str, list_of_values: list, list_of_labels: list, currency_labels: list) -> None:
+def display_bar_chart(title: str, list_of_values: list, list_of_labels: list, currency_labels: list,
+                      image_format: str = None):
     """
     Display a Bar Chart that contains information about how much money was spent over a period of time.
     :param title: The title to display at the top of the visualization.
     :param list_of_values: List containing all of the necessary values to display information.
     :param list_of_labels: List containing all of the labels to display on the visualization.
     :param currency_labels: List containing labels of currency information to display.
+    :param image_format: The format to render the chart to ('png' or 'svg') instead of displaying it.
+    :return: The path of the rendered chart, or None if the chart was displayed.
     """
-    display_visual(title=title,
-                   list_of_values=list_of_values,
-                   list_of_labels=list_of_labels,
-                   currency_labels=currency_labels,
-                   chart_type=Charts.BAR)
+    return output_visual(title=title,
+                       list_of_values=list_of_values,
+                       list_of_labels=list_of_labels,
+                       currency_labels=currency_labels,
+                       chart_type=Charts.BAR,
+                       image_format=image_format)
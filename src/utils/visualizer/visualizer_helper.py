@@ -1,10 +1,9 @@
-from objects.interface.dbconn import DB
 from utils import globals as _globals
-from utils.enums import Months, month_string_to_enum
+from utils.aggregator.aggregator import aggregate
+from utils.enums import Buckets, Months, month_string_to_enum
 from utils.exceptions import NoDataFound, NoTotalBetweenDates, NoTotalFound
-from utils.logger.logger import log
-from utils.dates.dates import get_dates, get_total_between_dates, get_all_years
-from utils.formatting.formatter import format_month_enum_to_string, format_date_pretty
+from utils.dates.dates import get_dates, get_total_between_dates
+from utils.formatting.formatter import format_month_enum_to_string, format_date_pretty, format_cents_to_amount
 
 
 def dictionary_has_data(dictionary_to_check: dict) -> bool:
@@ -56,23 +55,11 @@ def get_total_all_time(user_id: int) -> float:
     :raises NoDataFound: Exception that is raised when there is no data to be found all time.
     :return: The total spent all time.
     """
-    years = get_all_years(user_id)
+    # Sum the yearly totals in cents to avoid float rounding drift.
+    total_all_time = sum(aggregate(user_id, Buckets.YEAR).values())
 
-    # if there is any data.
-    if len(years) > 0:
-        total_all_time = 0.0
-        for year_tuple in years:
-            year = year_tuple[0]
-
-            # Add only the years that have data to the total.
-            try:
-                total_all_time += get_yearly_total(year, user_id)
-            except NoTotalFound as ntf:
-                log(f"User:{user_id}\t:\t{ntf.message}", level="warning")
-                continue
-
-        if total_all_time > 0:
-            return round(total_all_time, 2)
+    if total_all_time > 0:
+        return format_cents_to_amount(total_all_time)
 
     raise NoDataFound("all time")
 
@@ -87,30 +74,10 @@ def get_transactions_by_month(month: Months, year: str, user_id: int) -> dict:
     :return: A dictionary containing the transactions for a given month.
              The dictionary is set up as: {day : transaction_total}
     """
-    dates = get_dates(month, year)
-    db = DB(_globals.DATABASE)
-    daily_transactions = db.fetchall(
-        f"SELECT Date, Amount "
-        f"FROM Transactions "
-        f"WHERE Date BETWEEN DATE('{dates[0]}') AND DATE('{dates[1]}') AND User_id=?;",
-        values=(user_id,))
-    db.close()
-
-    transactions_dictionary = {}
+    daily_totals = aggregate(user_id, Buckets.DAY, get_dates(month, year))
 
-    # build the daily transactions dictionary
-    for transaction in daily_transactions:
-        day = transaction[0]
-        amount = float(transaction[1])
-
-        # if the current day isn't in the dictionary, set to that amount. Otherwise add to the previous amount.
-        if day not in transactions_dictionary:
-            transactions_dictionary[day] = amount
-        else:
-            transactions_dictionary[day] += amount
-
-    if dictionary_has_data(transactions_dictionary):
-        return transactions_dictionary
+    if dictionary_has_data(daily_totals):
+        return {day: format_cents_to_amount(cents) for day, cents in daily_totals.items()}
 
     raise NoDataFound(f"{format_month_enum_to_string(month)} {year}")
 
@@ -124,15 +91,13 @@ def get_transactions_by_year(year: str, user_id: int) -> dict:
     :return: A dictionary containing all of the monthly totals.
              The dictionary is set up as: {month : total}
     """
-    transactions_dictionary = {}
-    for month in _globals.months:
+    monthly_totals = aggregate(user_id, Buckets.MONTH, (f"{year}-01-01", f"{year}-12-31"))
 
-        # Add only the months that have data to the dictionary.
-        try:
-            transactions_dictionary[month] = get_monthly_total(month_string_to_enum(month), year, user_id)
-        except NoTotalFound as ntf:
-            log(f"User:{user_id}\t:\t{ntf.message}", level="warning")
-            continue
+    # Key each month by its name (JANUARY..DECEMBER), the form used by the months dictionary.
+    transactions_dictionary = {}
+    for year_and_month, cents in monthly_totals.items():
+        month = month_string_to_enum(year_and_month.split("-")[1])
+        transactions_dictionary[month.name] = format_cents_to_amount(cents)
 
     # return the dictionary if there is any information, otherwise raise the NoDataFound Exception
     if dictionary_has_data(transactions_dictionary):
@@ -149,25 +114,11 @@ def get_transactions_all_time(user_id: int) -> dict:
     :return: A dictionary containing all of the monthly totals.
              The dictionary is set up as: {year : total}
     """
-    transactions_dictionary = {}
-
-    years = get_all_years(user_id)
+    yearly_totals = aggregate(user_id, Buckets.YEAR)
 
-    # if there is any data.
-    if len(years) > 0:
-        for year_tuple in years:
-            year = year_tuple[0]
-
-            # Add only the years that have data to the dictionary.
-            try:
-                transactions_dictionary[year] = get_yearly_total(year, user_id)
-            except NoTotalFound as ntf:
-                log(f"User:{user_id}\t:\t{ntf.message}", level="warning")
-                continue
-
-        # return the dictionary if there is any information, otherwise raise the NoDataFound Exception
-        if dictionary_has_data(transactions_dictionary):
-            return transactions_dictionary
+    # return the dictionary if there is any information, otherwise raise the NoDataFound Exception
+    if dictionary_has_data(yearly_totals):
+        return {year: format_cents_to_amount(cents) for year, cents in yearly_totals.items()}
 
     raise NoDataFound("all time")
 
@@ -181,27 +132,9 @@ def get_merchant_information(dates: tuple, user_id: int) -> dict:
     :return: A dictionary containing all of the merchant information.
              The dictionary is set up as: {merchant : total_spent}
     """
-    db = DB(_globals.DATABASE)
-
-    query = f"""
-            SELECT Merchant, Amount
-            FROM Transactions
-            WHERE User_id=? 
-                  AND Date BETWEEN DATE('{dates[0]}') AND DATE('{dates[1]}');
-            """
-    list_of_merchants = db.fetchall(query, values=(user_id,))
-    db.close()
-
-    merchants = {}
-    for merchant_info in list_of_merchants:
-        merchant = merchant_info[0]
-        total_spent = round(float(merchant_info[1]), 2)
-        if merchant in merchants:
-            merchants[merchant] += total_spent
-        else:
-            merchants[merchant] = total_spent
+    merchants = aggregate(user_id, Buckets.MERCHANT, dates)
 
     if dictionary_has_data(merchants):
-        return merchants
+        return {merchant: format_cents_to_amount(cents) for merchant, cents in merchants.items()}
 
     raise NoDataFound(f"{format_date_pretty(dates[0])} - {format_date_pretty(dates[1])}")